@@ -24,69 +24,21 @@ PACKAGE_NAME=$(grep -m 1 "^name" Move.toml | sed 's/name[[:space:]]*=[[:space:]]
 echo "Package: $PACKAGE_NAME"
 echo ""
 
-# Run tests with gas limit
-echo "Running tests with gas profiling..."
-echo "(This may take a moment...)"
-echo ""
-
-# Capture test output
-TEST_OUTPUT=$(sui move test --gas-limit 1000000000 2>&1 || true)
-
-# Check if tests ran successfully
-if echo "$TEST_OUTPUT" | grep -q "FAILED"; then
-    echo "❌ Some tests failed. Gas report may be incomplete."
-    echo ""
-fi
-
-# Parse test results and gas usage
-echo "--- Gas Usage Summary ---"
-echo ""
-printf "%-50s %15s %10s\n" "Test" "Gas Used" "Status"
-printf "%-50s %15s %10s\n" "----" "--------" "------"
-
-# Extract test results
-# Format: "Test test_name ... ok" or "Test test_name ... FAILED"
-while IFS= read -r line; do
-    if [[ "$line" =~ ^[[:space:]]*Test[[:space:]]+([^[:space:]]+) ]]; then
-        TEST_NAME="${BASH_REMATCH[1]}"
-
-        # Determine status
-        if [[ "$line" =~ ok$ ]]; then
-            STATUS="✓ PASS"
-        elif [[ "$line" =~ FAILED$ ]]; then
-            STATUS="✗ FAIL"
-        else
-            STATUS="?"
-        fi
-
-        # Try to extract gas usage (this is approximate, as Sui doesn't always report per-test gas)
-        # For now, we'll just mark that it ran
-        GAS_USED="~estimated"
-
-        printf "%-50s %15s %10s\n" "$TEST_NAME" "$GAS_USED" "$STATUS"
-    fi
-done <<< "$TEST_OUTPUT"
-
-echo ""
-
-# Count tests
-TOTAL_TESTS=$(echo "$TEST_OUTPUT" | grep -c "^[[:space:]]*Test " || echo "0")
-PASSED_TESTS=$(echo "$TEST_OUTPUT" | grep -c " ok$" || echo "0")
-FAILED_TESTS=$(echo "$TEST_OUTPUT" | grep -c " FAILED$" || echo "0")
-
-echo "--- Summary ---"
-echo "Total tests: $TOTAL_TESTS"
-echo "Passed: $PASSED_TESTS"
-echo "Failed: $FAILED_TESTS"
+# Run tests with gas limit; per-test gas is streamed, aggregated per module
+# and (optionally) compared against a baseline by gas_report.py.
+# Extra arguments are passed through, e.g.:
+#   --baseline gas-baseline.json --threshold 5 --fail-on-regression   (exit 2 on regression)
+#   --save-baseline gas-baseline.json
+#   --markdown -o gas.md
+#   --verbose / -v   (echo the full test output as it streams)
+GAS_PY="$(cd "$(dirname "$0")/.." && pwd)/skills/sui-tester/scripts/gas_report.py"
+
+set +e
+python3 "$GAS_PY" --gas-limit 1000000000 "$@"
+STATUS=$?
+set -e
 echo ""
 
-# Display total gas if available in output
-if echo "$TEST_OUTPUT" | grep -q "gas used:"; then
-    TOTAL_GAS=$(echo "$TEST_OUTPUT" | grep "gas used:" | sed 's/.*gas used: \([0-9]*\).*/\1/' || echo "unknown")
-    echo "Total gas used: $TOTAL_GAS units"
-    echo ""
-fi
-
 # Gas cost reference
 echo "--- Gas Cost Reference ---"
 echo "Simple transfer: ~1,000 - 3,000 gas"
@@ -103,13 +55,9 @@ echo "• Costs may vary based on network conditions"
 echo "• Use these numbers for relative comparison"
 echo ""
 
-# Offer to show full output
-if [ "$1" == "--verbose" ] || [ "$1" == "-v" ]; then
-    echo "--- Full Test Output ---"
-    echo "$TEST_OUTPUT"
-    echo ""
-fi
-
 echo "=== Gas Report Complete ==="
 echo ""
 echo "Tip: Run with --verbose flag to see full test output"
+echo "Tip: Save a baseline with --save-baseline gas-baseline.json, then gate with --baseline gas-baseline.json --fail-on-regression"
+
+exit $STATUS
@@ -8,23 +8,29 @@ uncovered functions, lines, and branches with actionable suggestions.
 Usage:
     sui move coverage lcov
     python3 analyze_lcov.py lcov.info [-s sources/] [--issues-only] [--json]
+    python3 analyze_lcov.py lcov.info --summary-only --fail-under lines=90,branches=80
 """
 
 import argparse
 import json
+import operator
 import os
+import re
 import sys
+from array import array
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import Optional
+from itertools import compress
+from typing import Iterable, Optional, Union
 
 
-@dataclass
-class BranchInfo:
-    line: int
-    block: int
-    branch: int
-    taken: bool
-    count: int
+SUMMARY_RECORD = re.compile(rb'^(SF|FNF|FNH|LF|LH|BRF|BRH):(\d*)', re.MULTILINE)
+SUMMARY_KEYS = {
+    b'FNF': 'total_functions_found', b'FNH': 'total_functions_hit',
+    b'LF': 'total_lines_found', b'LH': 'total_lines_hit',
+    b'BRF': 'total_branches_found', b'BRH': 'total_branches_hit',
+}
+FAIL_UNDER_METRICS = ('lines', 'branches', 'functions')
 
 
 @dataclass
@@ -39,74 +45,141 @@ class FileCoverage:
     path: str
     functions: list[FunctionInfo] = field(default_factory=list)
     line_hits: dict[int, int] = field(default_factory=dict)
-    branches: list[BranchInfo] = field(default_factory=list)
+    # BRDA records in file order as parallel columns. Columns start as 16-bit
+    # arrays and widen (32-bit array, then plain list) when an id doesn't fit.
+    branch_lines: Union[array, list] = field(default_factory=lambda: array('H'))
+    branch_blocks: Union[array, list] = field(default_factory=lambda: array('H'))
+    branch_ids: Union[array, list] = field(default_factory=lambda: array('H'))
+    branch_taken: bytearray = field(default_factory=bytearray)
+    # Raw BRDA hit counts ('-' as -1), parallel to the columns; only kept on request
+    branch_counts: Optional[array] = None
     functions_found: int = 0
     functions_hit: int = 0
     lines_found: int = 0
     lines_hit: int = 0
     branches_found: int = 0
     branches_hit: int = 0
+    _branch_index: Optional[dict] = field(default=None, repr=False, compare=False)
+
+    def add_branch(self, line: int, block: int, branch: int, count: int, keep_count: bool = False):
+        try:
+            self.branch_lines.append(line)
+            self.branch_blocks.append(block)
+            self.branch_ids.append(branch)
+        except OverflowError:
+            self._widen(line, block, branch)
+        self.branch_taken.append(count > 0)
+        if keep_count:
+            if self.branch_counts is None:
+                self.branch_counts = array('q')
+            self.branch_counts.append(count)
+
+    def _widen(self, line: int, block: int, branch: int):
+        """Re-append a record after widening the columns that can't hold it."""
+        n = len(self.branch_taken)
+        columns = []
+        for col, value in ((self.branch_lines, line), (self.branch_blocks, block), (self.branch_ids, branch)):
+            col = col[:n]
+            while isinstance(col, array):
+                try:
+                    col.append(value)
+                    break
+                except OverflowError:
+                    col = array('I', col) if col.typecode == 'H' else list(col)
+            else:
+                col.append(value)
+            columns.append(col)
+        self.branch_lines, self.branch_blocks, self.branch_ids = columns
+
+    def branches_at(self, line: int) -> list[tuple[int, int, bool, Optional[int]]]:
+        """(block, branch, taken, count) for every BRDA at a line; count is None unless kept."""
+        if self._branch_index is None:
+            index: dict[int, list[int]] = {}
+            for i, ln in enumerate(self.branch_lines):
+                index.setdefault(ln, []).append(i)
+            self._branch_index = index
+        counts = self.branch_counts
+        return [(self.branch_blocks[i], self.branch_ids[i], bool(self.branch_taken[i]),
+                 counts[i] if counts is not None else None)
+                for i in self._branch_index.get(line, ())]
+
+    def _untaken_mask(self):
+        return map(operator.not_, self.branch_taken)
+
+    def untaken_by_line(self) -> dict[int, int]:
+        """Source line -> number of untaken branches, in file order."""
+        return Counter(compress(self.branch_lines, self._untaken_mask()))
+
+    def untaken_branches(self) -> list[tuple[int, int, int]]:
+        """(line, block, branch) of every untaken branch, in file order."""
+        return list(compress(zip(self.branch_lines, self.branch_blocks, self.branch_ids), self._untaken_mask()))
+
+
+def parse_lcov(lcov_path: str, branch_counts: bool = False) -> list[FileCoverage]:
+    """Parse LCOV file and return coverage data per source file.
+
+    Branch hit counts are dropped unless `branch_counts` is set; the
+    taken/untaken split is always kept (see FileCoverage.branches_at).
+    """
+    with open(lcov_path, 'r') as f:
+        return parse_lcov_lines(f, branch_counts)
 
 
-def parse_lcov(lcov_path: str) -> list[FileCoverage]:
-    """Parse LCOV file and return coverage data per source file."""
+def parse_lcov_lines(lines: Iterable[str], branch_counts: bool = False) -> list[FileCoverage]:
+    """Parse LCOV records from any iterable of lines (see parse_lcov)."""
     files = []
     current = None
     fn_lines = {}
     fn_counts = {}
 
-    with open(lcov_path, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-
-            if line.startswith('SF:'):
-                current = FileCoverage(path=line[3:])
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if line.startswith('SF:'):
+            current = FileCoverage(path=line[3:])
+            fn_lines = {}
+            fn_counts = {}
+        elif line.startswith('FN:'):
+            parts = line[3:].split(',', 1)
+            if len(parts) == 2:
+                fn_lines[parts[1]] = int(parts[0])
+        elif line.startswith('FNDA:'):
+            parts = line[5:].split(',', 1)
+            if len(parts) == 2 and current:
+                fn_counts[parts[1]] = int(parts[0])
+        elif line.startswith('DA:'):
+            parts = line[3:].split(',')
+            if len(parts) == 2 and current:
+                current.line_hits[int(parts[0])] = int(parts[1])
+        elif line.startswith('BRDA:'):
+            parts = line[5:].split(',')
+            if len(parts) == 4 and current:
+                count = -1 if parts[3] == '-' else int(parts[3])
+                current.add_branch(int(parts[0]), int(parts[1]), int(parts[2]), count, branch_counts)
+        elif line.startswith('FNF:') and current:
+            current.functions_found = int(line[4:])
+        elif line.startswith('FNH:') and current:
+            current.functions_hit = int(line[4:])
+        elif line.startswith('LF:') and current:
+            current.lines_found = int(line[3:])
+        elif line.startswith('LH:') and current:
+            current.lines_hit = int(line[3:])
+        elif line.startswith('BRF:') and current:
+            current.branches_found = int(line[4:])
+        elif line.startswith('BRH:') and current:
+            current.branches_hit = int(line[4:])
+        elif line == 'end_of_record':
+            if current:
+                for name, fn_line in fn_lines.items():
+                    current.functions.append(FunctionInfo(
+                        name=name, line=fn_line, call_count=fn_counts.get(name, 0)
+                    ))
+                files.append(current)
+                current = None
                 fn_lines = {}
                 fn_counts = {}
-            elif line.startswith('FN:'):
-                parts = line[3:].split(',', 1)
-                if len(parts) == 2:
-                    fn_lines[parts[1]] = int(parts[0])
-            elif line.startswith('FNDA:'):
-                parts = line[5:].split(',', 1)
-                if len(parts) == 2 and current:
-                    fn_counts[parts[1]] = int(parts[0])
-            elif line.startswith('DA:'):
-                parts = line[3:].split(',')
-                if len(parts) == 2 and current:
-                    current.line_hits[int(parts[0])] = int(parts[1])
-            elif line.startswith('BRDA:'):
-                parts = line[5:].split(',')
-                if len(parts) == 4 and current:
-                    count = -1 if parts[3] == '-' else int(parts[3])
-                    current.branches.append(BranchInfo(
-                        line=int(parts[0]), block=int(parts[1]),
-                        branch=int(parts[2]), taken=count > 0, count=count
-                    ))
-            elif line.startswith('FNF:') and current:
-                current.functions_found = int(line[4:])
-            elif line.startswith('FNH:') and current:
-                current.functions_hit = int(line[4:])
-            elif line.startswith('LF:') and current:
-                current.lines_found = int(line[3:])
-            elif line.startswith('LH:') and current:
-                current.lines_hit = int(line[3:])
-            elif line.startswith('BRF:') and current:
-                current.branches_found = int(line[4:])
-            elif line.startswith('BRH:') and current:
-                current.branches_hit = int(line[4:])
-            elif line == 'end_of_record':
-                if current:
-                    for name, fn_line in fn_lines.items():
-                        current.functions.append(FunctionInfo(
-                            name=name, line=fn_line, call_count=fn_counts.get(name, 0)
-                        ))
-                    files.append(current)
-                    current = None
-                    fn_lines = {}
-                    fn_counts = {}
 
     if current:
         for name, fn_line in fn_lines.items():
@@ -118,6 +191,60 @@ def parse_lcov(lcov_path: str) -> list[FileCoverage]:
     return files
 
 
+def summarize_lcov(lcov_path: str, chunk_size: int = 1 << 22) -> dict:
+    """Compute analyze()'s summary from SF and FNF/FNH/LF/LH/BRF/BRH records only.
+
+    Reads the file in large binary chunks and lets the regex engine skip the
+    DA/BRDA/FN lines, which is much faster than parse_lcov on big reports.
+    """
+    summary = {'total_files': 0}
+    summary.update(dict.fromkeys(SUMMARY_KEYS.values(), 0))
+    tail = b''
+    with open(lcov_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            data = tail + chunk
+            if chunk:
+                cut = data.rfind(b'\n') + 1
+                data, tail = data[:cut], data[cut:]
+            for m in SUMMARY_RECORD.finditer(data):
+                if m.group(1) == b'SF':
+                    summary['total_files'] += 1
+                elif m.group(2):
+                    summary[SUMMARY_KEYS[m.group(1)]] += int(m.group(2))
+            if not chunk:
+                break
+    return add_coverage_pcts(summary)
+
+
+def parse_fail_under(spec: str) -> dict[str, float]:
+    """Parse `lines=90,branches=80` into {'lines': 90.0, 'branches': 80.0}."""
+    thresholds = {}
+    for item in spec.split(','):
+        name, sep, value = item.strip().partition('=')
+        if not sep or name not in FAIL_UNDER_METRICS:
+            raise ValueError(f"invalid --fail-under entry '{item}' "
+                             f"(expected {'/'.join(FAIL_UNDER_METRICS)}=<percent>)")
+        thresholds[name] = float(value)
+    return thresholds
+
+
+def check_fail_under(summary: dict, thresholds: dict[str, float]) -> list[str]:
+    """Return a message per metric below its threshold; metrics with no data pass.
+
+    Compares the unrounded hit/found ratio, so 89.96% does not pass 90.
+    """
+    failures = []
+    for name, minimum in thresholds.items():
+        found = summary.get(f'total_{name}_found')
+        if not found:
+            continue
+        hit = summary[f'total_{name}_hit']
+        if hit * 100 < minimum * found:
+            failures.append(f"{name} coverage {100 * hit / found:.2f}% is below {minimum:g}%")
+    return failures
+
+
 def read_source_lines(source_path: str) -> dict[int, str]:
     """Read source file and return line number -> content mapping."""
     lines = {}
@@ -145,15 +272,10 @@ def generate_suggestions(cov: FileCoverage, source_lines: Optional[dict] = None)
                 sug['source'] = source_lines[f.line]
             suggestions.append(sug)
 
-    branch_lines = {}
-    for b in cov.branches:
-        if not b.taken:
-            branch_lines.setdefault(b.line, []).append(b)
-
-    for line, branches in branch_lines.items():
+    for line, untaken in cov.untaken_by_line().items():
         sug = {
             'type': 'untaken_branch', 'priority': 'medium',
-            'line': line, 'branches': len(branches),
+            'line': line, 'branches': untaken,
             'action': f'Add test to cover alternate branch at line {line}'
         }
         if source_lines and line in source_lines:
@@ -183,6 +305,17 @@ def generate_suggestions(cov: FileCoverage, source_lines: Optional[dict] = None)
     return suggestions
 
 
+def add_coverage_pcts(summary: dict) -> dict:
+    """Fill in *_coverage_pct from the total_*_found/hit counters."""
+    if summary['total_lines_found']:
+        summary['line_coverage_pct'] = round(100 * summary['total_lines_hit'] / summary['total_lines_found'], 1)
+    if summary['total_branches_found']:
+        summary['branch_coverage_pct'] = round(100 * summary['total_branches_hit'] / summary['total_branches_found'], 1)
+    if summary['total_functions_found']:
+        summary['function_coverage_pct'] = round(100 * summary['total_functions_hit'] / summary['total_functions_found'], 1)
+    return summary
+
+
 def analyze(lcov_path: str, source_dir: Optional[str] = None) -> dict:
     """Main analysis function."""
     files = parse_lcov(lcov_path)
@@ -197,12 +330,7 @@ def analyze(lcov_path: str, source_dir: Optional[str] = None) -> dict:
         'total_branches_hit': sum(f.branches_hit for f in files),
     }
 
-    if summary['total_lines_found']:
-        summary['line_coverage_pct'] = round(100 * summary['total_lines_hit'] / summary['total_lines_found'], 1)
-    if summary['total_branches_found']:
-        summary['branch_coverage_pct'] = round(100 * summary['total_branches_hit'] / summary['total_branches_found'], 1)
-    if summary['total_functions_found']:
-        summary['function_coverage_pct'] = round(100 * summary['total_functions_hit'] / summary['total_functions_found'], 1)
+    add_coverage_pcts(summary)
 
     results = {'summary': summary, 'files': []}
 
@@ -224,8 +352,8 @@ def analyze(lcov_path: str, source_dir: Optional[str] = None) -> dict:
                 'branches': f"{cov.branches_hit}/{cov.branches_found}",
             },
             'uncovered_lines': uncovered_lines,
-            'untaken_branches': [{'line': b.line, 'block': b.block, 'branch': b.branch}
-                                 for b in cov.branches if not b.taken],
+            'untaken_branches': [{'line': ln, 'block': blk, 'branch': br}
+                                 for ln, blk, br in cov.untaken_branches()],
             'uncalled_functions': [{'name': f.name, 'line': f.line}
                                    for f in cov.functions if f.call_count == 0],
             'suggestions': generate_suggestions(cov, source_lines),
@@ -258,11 +386,12 @@ def print_human_readable(results: dict):
                 print(f"      - {f['name']} (line {f['line']})")
 
         if fd['untaken_branches']:
-            lines = set(b['line'] for b in fd['untaken_branches'])
+            per_line = {}
+            for b in fd['untaken_branches']:
+                per_line[b['line']] = per_line.get(b['line'], 0) + 1
             print("\n   Untaken branches:")
-            for ln in sorted(lines):
-                count = sum(1 for b in fd['untaken_branches'] if b['line'] == ln)
-                print(f"      - Line {ln}: {count} branch(es) not taken")
+            for ln in sorted(per_line):
+                print(f"      - Line {ln}: {per_line[ln]} branch(es) not taken")
 
         if fd['suggestions']:
             print("\n   Suggestions:")
@@ -280,15 +409,27 @@ def main():
     parser.add_argument('--json', '-j', action='store_true', help='Output as JSON')
     parser.add_argument('--filter', '-f', help='Only show files matching this path pattern')
     parser.add_argument('--issues-only', '-i', action='store_true', help='Only show files with coverage issues')
+    parser.add_argument('--summary-only', action='store_true', help='Only compute totals (fast path for CI gating; ignores --filter/--issues-only)')
+    parser.add_argument('--fail-under', help='Exit with status 2 if coverage is below, e.g. lines=90,branches=80')
     args = parser.parse_args()
 
     if not os.path.exists(args.lcov_file):
         print(f"Error: File not found: {args.lcov_file}", file=sys.stderr)
         sys.exit(1)
 
-    results = analyze(args.lcov_file, args.source_dir)
+    try:
+        thresholds = parse_fail_under(args.fail_under) if args.fail_under else {}
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.summary_only:
+        results = {'summary': summarize_lcov(args.lcov_file), 'files': []}
+    else:
+        results = analyze(args.lcov_file, args.source_dir)
+    failures = check_fail_under(results['summary'], thresholds)
 
-    if args.filter or args.issues_only:
+    if (args.filter or args.issues_only) and not args.summary_only:
         filtered = []
         for fd in results['files']:
             if args.filter and args.filter not in fd['path']:
@@ -304,6 +445,11 @@ def main():
     else:
         print_human_readable(results)
 
+    if failures:
+        for msg in failures:
+            print(f"FAIL: {msg}", file=sys.stderr)
+        sys.exit(2)
+
 
 if __name__ == '__main__':
     main()
@@ -5,54 +5,180 @@ Analyze Sui Move source coverage with precise uncovered code detection.
 Usage:
     python3 analyze_source.py --module <module_name> [--path <package_path>]
     python3 analyze_source.py -m my_module -o coverage.md
+    python3 analyze_source.py -m my_module --save-capture my_module.ansi
+    python3 analyze_source.py -m my_module --from-capture my_module.ansi --json
 
 This script uses PTY to capture colored output from `sui move coverage source`,
 preserving ANSI color codes that indicate covered (green) vs uncovered (red) code.
+Captures are cached per module and reused until the package's coverage map or
+build artifacts change, so re-rendering the same data does not re-invoke sui.
 """
 
+import glob
+import hashlib
 import os
 import pty
+import shutil
 import sys
 import re
+import threading
 import json
+import subprocess
 import argparse
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 ANSI_CODE = re.compile(r'\x1b\[[\d;]*m')
 RED_PATTERN = re.compile(r'\x1b\[1?;?31m')
 GREEN_PATTERN = re.compile(r'\x1b\[32m')
 RESET_PATTERN = re.compile(r'\x1b\[0m|\x1b\[39m')
+ANSI_SPLIT = re.compile(r'(\x1b\[[\d;]*m)')
+FUNC_PATTERN = re.compile(r'(?:public\s+)?(?:entry\s+)?fun\s+(\w+)')
+IDENTIFIER = re.compile(r'^[a-z_]\w*$')
 
 
-def run_coverage_with_pty(module_name: str, package_path: str = '.') -> str:
-    """Run sui move coverage source with PTY to preserve colors."""
+class CaptureError(RuntimeError):
+    """`sui move coverage` exited with a non-zero status."""
+
+
+def run_with_pty(argv: List[str], cwd: str = '.') -> Tuple[str, int]:
+    """Run a command attached to a PTY so it keeps its ANSI colors; returns (output, exit code)."""
     master, slave = pty.openpty()
-    pid = os.fork()
-
-    if pid == 0:
-        os.close(master)
-        os.setsid()
-        os.dup2(slave, 0)
-        os.dup2(slave, 1)
-        os.dup2(slave, 2)
+    try:
+        proc = subprocess.Popen(argv, stdin=slave, stdout=slave, stderr=slave,
+                                cwd=cwd, start_new_session=True)
+    finally:
         os.close(slave)
-        os.chdir(package_path)
-        os.execvp('sui', ['sui', 'move', 'coverage', 'source', '--module', module_name])
-    else:
-        os.close(slave)
-        output = b''
-        while True:
-            try:
-                data = os.read(master, 4096)
-                if not data:
-                    break
-                output += data
-            except OSError:
+    chunks = []
+    while True:
+        try:
+            data = os.read(master, 65536)
+            if not data:
                 break
-        os.close(master)
-        os.waitpid(pid, 0)
-        return output.decode('utf-8', errors='replace')
+            chunks.append(data)
+        except OSError:
+            break
+    os.close(master)
+    returncode = proc.wait()
+    return b''.join(chunks).decode('utf-8', errors='replace'), returncode
+
+
+def run_coverage_with_pty(module_name: str, package_path: str = '.', sui_bin: str = 'sui') -> str:
+    """Run sui move coverage source with PTY to preserve colors."""
+    return run_with_pty([sui_bin, 'move', 'coverage', 'source', '--module', module_name], package_path)[0]
+
+
+def _run_capture(argv: List[str], package_path: str, announce: bool) -> str:
+    if announce:
+        print(f"Running: {' '.join(argv)}", file=sys.stderr)
+    output, returncode = run_with_pty(argv, package_path)
+    if returncode != 0:
+        tail = ANSI_CODE.sub('', output).strip().splitlines()[-3:]
+        raise CaptureError(f"{' '.join(argv[1:])} exited with status {returncode}"
+                           + (': ' + ' | '.join(tail) if tail else ''))
+    return output
+
+
+COVERAGE_MAP = '.coverage_map.mvcov'
+
+
+def default_cache_dir() -> str:
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'sui-tester', 'captures')
+
+
+def coverage_inputs(package_path: str = '.') -> List[str]:
+    """Files whose changes invalidate a coverage capture: the coverage map, sources and build output."""
+    coverage_map = os.path.join(package_path, COVERAGE_MAP)
+    if not os.path.exists(coverage_map):
+        return []
+    inputs = [coverage_map]
+    for pattern in ('sources/**/*.move', 'build/*/bytecode_modules/*.mv', 'build/*/source_maps/*'):
+        inputs += sorted(glob.glob(os.path.join(package_path, pattern), recursive=True))
+    return inputs
+
+
+def capture_key(kind: str, module_name: str, package_path: str = '.', sui_bin: str = 'sui') -> Optional[str]:
+    """Cache key from the module, the sui binary and the contents of every coverage input, or None.
+
+    Contents rather than mtimes: `sui move coverage` rebuilds the package
+    itself, rewriting build/ with identical bytes on every run.
+    """
+    inputs = coverage_inputs(package_path)
+    if not inputs:
+        return None
+    sui_path = shutil.which(sui_bin) or sui_bin
+    h = hashlib.sha256(f'{kind}\0{module_name}\0{os.path.abspath(package_path)}\0'
+                       f'{os.path.realpath(sui_path)}'.encode())
+    for path in inputs:
+        h.update(f'\0{os.path.relpath(path, package_path)}\0'.encode())
+        try:
+            with open(path, 'rb') as f:
+                h.update(hashlib.sha256(f.read()).digest())
+        except OSError:
+            h.update(b'?')
+    return h.hexdigest()
+
+
+_package_locks: dict = {}
+_package_locks_guard = threading.Lock()
+
+
+def package_lock(package_path: str) -> threading.Lock:
+    """Per-package lock: concurrent `sui move coverage` runs would all rebuild the same build/."""
+    with _package_locks_guard:
+        return _package_locks.setdefault(os.path.abspath(package_path), threading.Lock())
+
+
+def capture_coverage(kind: str, module_name: str, package_path: str = '.', sui_bin: str = 'sui',
+                     cache_dir: Optional[str] = None, announce: bool = False) -> str:
+    """Return `sui move coverage <kind> --module` output, reusing a cached capture when valid.
+
+    Raises CaptureError if sui fails; failed runs are never cached. Pass
+    cache_dir='' to bypass the cache, announce=True to log when sui runs.
+    Captures for the same package run one at a time, so callers can fan out
+    over threads and only the parsing overlaps.
+    """
+    with package_lock(package_path):
+        return _capture_coverage(kind, module_name, package_path, sui_bin, cache_dir, announce)
+
+
+def _capture_coverage(kind: str, module_name: str, package_path: str, sui_bin: str,
+                      cache_dir: Optional[str], announce: bool) -> str:
+    argv = [sui_bin, 'move', 'coverage', kind, '--module', module_name]
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    key = capture_key(kind, module_name, package_path, sui_bin) if cache_dir else None
+    if key is None:
+        return _run_capture(argv, package_path, announce)
+
+    sui_path = os.path.realpath(shutil.which(sui_bin) or sui_bin)
+    package_id = hashlib.sha256(f'{os.path.abspath(package_path)}\0{sui_path}'.encode()).hexdigest()[:12]
+    prefix = f'{package_id}.{module_name}.{kind}.'
+    path = os.path.join(cache_dir, f'{prefix}{key[:32]}.ansi')
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        pass
+
+    output = _run_capture(argv, package_path, announce)
+    # The run may have rebuilt the package; store under the state it left behind.
+    key = capture_key(kind, module_name, package_path, sui_bin)
+    if key is None:
+        return output
+    path = os.path.join(cache_dir, f'{prefix}{key[:32]}.ansi')
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for stale in glob.glob(os.path.join(cache_dir, glob.escape(prefix) + '*.ansi')):
+            os.remove(stale)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(output)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    return output
 
 
 @dataclass
@@ -76,7 +202,7 @@ def parse_colored_output(output: str) -> List[UncoveredSegment]:
             continue
 
         clean_line = ANSI_CODE.sub('', line)
-        parts = re.split(r'(\x1b\[[\d;]*m)', line)
+        parts = ANSI_SPLIT.split(line)
 
         current_color = None
         position = 0
@@ -116,10 +242,9 @@ def parse_colored_output(output: str) -> List[UncoveredSegment]:
 
 def group_by_function(uncovered: List[UncoveredSegment], source_lines: List[str]) -> dict:
     """Group uncovered segments by function."""
-    func_pattern = re.compile(r'(?:public\s+)?(?:entry\s+)?fun\s+(\w+)')
     func_starts = {}
     for i, line in enumerate(source_lines, 1):
-        match = func_pattern.search(line)
+        match = FUNC_PATTERN.search(line)
         if match:
             func_starts[i] = match.group(1)
 
@@ -230,7 +355,7 @@ def generate_markdown(uncovered: List[UncoveredSegment], module_name: str) -> st
             lines.append(f"  - Write `#[expected_failure]` test for this assert")
         lines.append("")
 
-    func_names = [s for s in uncovered if re.match(r'^[a-z_]\w*$', s.uncovered_text) and len(s.uncovered_text) > 1]
+    func_names = [s for s in uncovered if IDENTIFIER.match(s.uncovered_text) and len(s.uncovered_text) > 1]
     if func_names:
         lines.append("### Call Uncovered Functions")
         lines.append("")
@@ -244,6 +369,18 @@ def generate_markdown(uncovered: List[UncoveredSegment], module_name: str) -> st
     return '\n'.join(lines)
 
 
+def uncovered_to_dict(module_name: str, uncovered: List[UncoveredSegment]) -> dict:
+    """JSON form of the uncovered segments, as printed by --json."""
+    return {
+        'module': module_name,
+        'uncovered_count': len(uncovered),
+        'uncovered': [
+            {'line': s.line_num, 'full_line': s.full_line, 'uncovered_text': s.uncovered_text}
+            for s in uncovered
+        ]
+    }
+
+
 def main():
     parser = argparse.ArgumentParser(description='Analyze Sui Move source coverage')
     parser.add_argument('--module', '-m', required=True, help='Module name to analyze')
@@ -251,21 +388,30 @@ def main():
     parser.add_argument('--json', '-j', action='store_true', help='Output as JSON')
     parser.add_argument('--markdown', '--md', action='store_true', help='Output as Markdown')
     parser.add_argument('--output', '-o', help='Output file path (e.g., coverage.md)')
+    parser.add_argument('--sui', default=os.environ.get('SUI_BIN', 'sui'), help='sui executable (default: $SUI_BIN or sui)')
+    parser.add_argument('--from-capture', help='Replay a saved capture instead of running sui')
+    parser.add_argument('--save-capture', help='Also write the raw captured output to this file')
+    parser.add_argument('--cache-dir', default=default_cache_dir(), help='Capture cache directory')
+    parser.add_argument('--no-cache', action='store_true', help='Always re-run sui move coverage source')
     args = parser.parse_args()
 
-    print(f"Running: sui move coverage source --module {args.module}", file=sys.stderr)
-    output = run_coverage_with_pty(args.module, args.path)
+    if args.from_capture:
+        with open(args.from_capture, 'r', encoding='utf-8', errors='replace') as f:
+            output = f.read()
+    else:
+        try:
+            output = capture_coverage('source', args.module, args.path, args.sui,
+                                      cache_dir='' if args.no_cache else args.cache_dir, announce=True)
+        except (CaptureError, OSError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    if args.save_capture:
+        with open(args.save_capture, 'w', encoding='utf-8') as f:
+            f.write(output)
     uncovered = parse_colored_output(output)
 
     if args.json:
-        result = json.dumps({
-            'module': args.module,
-            'uncovered_count': len(uncovered),
-            'uncovered': [
-                {'line': s.line_num, 'full_line': s.full_line, 'uncovered_text': s.uncovered_text}
-                for s in uncovered
-            ]
-        }, indent=2)
+        result = json.dumps(uncovered_to_dict(args.module, uncovered), indent=2)
     elif args.markdown or (args.output and args.output.endswith('.md')):
         result = generate_markdown(uncovered, args.module)
     else:
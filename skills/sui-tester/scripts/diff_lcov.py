@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Compare Sui Move LCOV coverage between two runs (e.g. PR base and head).
+
+Matches SF records by path, skips records whose content hash is identical,
+and deep-parses only the rest. Reports per-file and per-function deltas.
+With a unified diff, only files touched by the diff are compared, so the
+cost follows the size of the change rather than the size of the repo.
+
+Line and branch findings (newly uncovered/covered lines, newly untaken
+branches) need --changes: base and head are matched by raw line number,
+and without the diff an insertion shifts every later line. Without it they
+are only reported for files that are new in head.
+
+Usage:
+    python3 diff_lcov.py base/lcov.info head/lcov.info
+    git diff -U0 main...HEAD | python3 diff_lcov.py base.info head.info --changes -
+    python3 diff_lcov.py base.info head.info --changes pr.diff --fail-on-new-uncovered [--json | --markdown]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from typing import Optional
+
+from analyze_lcov import SUMMARY_KEYS, SUMMARY_RECORD, FileCoverage, add_coverage_pcts, parse_lcov_lines
+
+HUNK_HEADER = re.compile(r'^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+SUMMARY_COUNTERS = ('functions', 'lines', 'branches')
+
+
+def split_records(lcov_path: str) -> dict[str, bytes]:
+    """Map SF path -> raw record body without parsing DA/BRDA/FN lines.
+
+    Raises ValueError if a path has more than one record; their counters
+    can't be combined without parsing, so the report would be wrong.
+    """
+    with open(lcov_path, 'rb') as f:
+        data = f.read()
+    records = {}
+    for rec in data.split(b'end_of_record'):
+        start = rec.find(b'SF:')
+        if start < 0:
+            continue
+        eol = rec.find(b'\n', start)
+        if eol < 0:
+            eol = len(rec)
+        path = rec[start + 3:eol].strip().decode('utf-8', errors='replace')
+        if path in records:
+            raise ValueError(f'{lcov_path}: duplicate SF record for {path} '
+                             '(merge the reports first, e.g. lcov -a)')
+        records[path] = rec[eol + 1:]
+    return records
+
+
+def record_hash(body: bytes) -> bytes:
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+def record_counters(body: bytes) -> dict[str, int]:
+    """FNF/FNH/LF/LH/BRF/BRH totals of one record body, as summarize_lcov counts them."""
+    counters = dict.fromkeys(SUMMARY_KEYS.values(), 0)
+    for m in SUMMARY_RECORD.finditer(body):
+        if m.group(2) and m.group(1) in SUMMARY_KEYS:
+            counters[SUMMARY_KEYS[m.group(1)]] += int(m.group(2))
+    return counters
+
+
+def summarize_records(records: dict[str, bytes], hashes: dict[str, bytes],
+                      known: Optional[dict[bytes, dict]] = None) -> dict:
+    """summarize_lcov's summary from split records; `known` maps record hash -> counters to reuse."""
+    known = {} if known is None else known
+    summary = {'total_files': len(records)}
+    summary.update(dict.fromkeys(SUMMARY_KEYS.values(), 0))
+    for path, body in records.items():
+        h = hashes[path]
+        counters = known.get(h)
+        if counters is None:
+            counters = known[h] = record_counters(body)
+        for key, value in counters.items():
+            summary[key] += value
+    return add_coverage_pcts(summary)
+
+
+def parse_record(path: str, body: bytes) -> FileCoverage:
+    lines = [f'SF:{path}'] + body.decode('utf-8', errors='replace').splitlines()
+    return parse_lcov_lines(lines)[0]
+
+
+def parse_unified_diff(lines) -> dict[str, set[int]]:
+    """Map each file in a unified diff to the head-side line numbers it adds or changes.
+
+    Hunk bodies are consumed by their header counts, so added or removed
+    lines that look like `+++ `/`--- ` headers are treated as content.
+    """
+    changes: dict[str, set[int]] = {}
+    current = None
+    line_no = 0
+    old_left = new_left = 0
+    after_old_header = False
+    for line in lines:
+        if old_left > 0 or new_left > 0:
+            if line.startswith('+'):
+                if current is not None:
+                    current.add(line_no)
+                line_no += 1
+                new_left -= 1
+                continue
+            if line.startswith('-'):
+                old_left -= 1
+                continue
+            if line.startswith(' ') or line in ('\n', '\r\n'):
+                line_no += 1
+                old_left -= 1
+                new_left -= 1
+                continue
+            if line.startswith('\\'):
+                continue
+            old_left = new_left = 0  # miscounted hunk: read this line as a header
+
+        if line.startswith('+++ ') and after_old_header:
+            target = line[4:].rstrip('\r\n').split('\t')[0]
+            if target == '/dev/null':
+                current = None
+            else:
+                current = changes.setdefault(target[2:] if target.startswith('b/') else target, set())
+            after_old_header = False
+            continue
+        after_old_header = line.startswith('--- ')
+        match = HUNK_HEADER.match(line)
+        if match:
+            old_left = int(match.group(1) or 1)
+            line_no = int(match.group(2))
+            new_left = int(match.group(3) or 1)
+    return changes
+
+
+def match_paths(base: dict, head: dict) -> list[tuple[Optional[str], Optional[str]]]:
+    """Pair SF paths across runs: exact path first, then by basename when unique on both sides."""
+    pairs = [(p, p) for p in head if p in base]
+    base_left = [p for p in base if p not in head]
+    head_left = [p for p in head if p not in base]
+
+    def by_name(paths):
+        names = {}
+        for p in paths:
+            names.setdefault(os.path.basename(p), []).append(p)
+        return {n: ps[0] for n, ps in names.items() if len(ps) == 1}
+
+    base_names, head_names = by_name(base_left), by_name(head_left)
+    matched_base, matched_head = set(), set()
+    for name, hp in head_names.items():
+        bp = base_names.get(name)
+        if bp:
+            pairs.append((bp, hp))
+            matched_base.add(bp)
+            matched_head.add(hp)
+    pairs += [(None, p) for p in head_left if p not in matched_head]
+    pairs += [(p, None) for p in base_left if p not in matched_base]
+    return pairs
+
+
+def changed_lines_for(path: str, changes: dict[str, set[int]]) -> Optional[set[int]]:
+    """Changed lines of the diff file whose path is a suffix of the SF path, else None."""
+    norm = path.replace('\\', '/')
+    for diff_path, lines in changes.items():
+        if norm == diff_path or norm.endswith('/' + diff_path):
+            return lines
+    return None
+
+
+def _counters(cov: Optional[FileCoverage]) -> dict:
+    if cov is None:
+        return {c: (0, 0) for c in SUMMARY_COUNTERS}
+    return {'functions': (cov.functions_found, cov.functions_hit),
+            'lines': (cov.lines_found, cov.lines_hit),
+            'branches': (cov.branches_found, cov.branches_hit)}
+
+
+def _pct(found: int, hit: int) -> Optional[float]:
+    return round(100 * hit / found, 1) if found else None
+
+
+def diff_file(base: Optional[FileCoverage], head: Optional[FileCoverage],
+              changed: Optional[set[int]] = None) -> dict:
+    """Per-file coverage delta.
+
+    Line and branch findings are limited to `changed` when given. Without
+    it they are only produced for files with no base record, because raw
+    line numbers don't line up across an edit.
+    """
+    bc, hc = _counters(base), _counters(head)
+    coverage = {}
+    for c in SUMMARY_COUNTERS:
+        (bf, bh), (hf, hh) = bc[c], hc[c]
+        bp, hp = _pct(bf, bh), _pct(hf, hh)
+        coverage[c] = {'base': f'{bh}/{bf}', 'head': f'{hh}/{hf}', 'base_pct': bp, 'head_pct': hp,
+                       'delta_pct': round(hp - bp, 1) if bp is not None and hp is not None else None}
+
+    line_findings = changed is not None or base is None
+    base_hits = base.line_hits if base else {}
+    head_hits = head.line_hits if head and line_findings else {}
+    newly_uncovered = sorted(ln for ln, n in head_hits.items()
+                             if n == 0 and (ln not in base_hits or base_hits[ln] > 0))
+    newly_covered = sorted(ln for ln, n in head_hits.items() if n > 0 and base_hits.get(ln) == 0)
+    if changed is not None:
+        newly_uncovered = [ln for ln in newly_uncovered if ln in changed]
+        newly_covered = [ln for ln in newly_covered if ln in changed]
+
+    newly_untaken = []
+    if head and line_findings:
+        base_untaken = set(base.untaken_branches()) if base else set()
+        newly_untaken = [{'line': ln, 'block': blk, 'branch': br}
+                         for ln, blk, br in head.untaken_branches()
+                         if (ln, blk, br) not in base_untaken and (changed is None or ln in changed)]
+
+    base_fns = {f.name: f.call_count for f in base.functions} if base else {}
+    head_fns = {f.name: f for f in head.functions} if head else {}
+    functions = []
+    for name, f in head_fns.items():
+        old = base_fns.get(name)
+        if old is None:
+            status = 'added_uncalled' if f.call_count == 0 else 'added'
+        elif old > 0 and f.call_count == 0:
+            status = 'newly_uncalled'
+        elif old == 0 and f.call_count > 0:
+            status = 'newly_called'
+        elif old != f.call_count:
+            status = 'changed'
+        else:
+            continue
+        functions.append({'name': name, 'line': f.line, 'base_calls': old,
+                          'head_calls': f.call_count, 'status': status})
+    for name, calls in base_fns.items():
+        if name not in head_fns:
+            functions.append({'name': name, 'line': None, 'base_calls': calls,
+                              'head_calls': None, 'status': 'removed'})
+
+    return {
+        'coverage': coverage,
+        'newly_uncovered_lines': newly_uncovered,
+        'newly_covered_lines': newly_covered,
+        'newly_untaken_branches': newly_untaken,
+        'functions': functions,
+    }
+
+
+def diff_lcov(base_path: str, head_path: str, changes: Optional[dict[str, set[int]]] = None) -> dict:
+    """Compare two LCOV files, deep-parsing only records whose content changed."""
+    base_records = split_records(base_path)
+    head_records = split_records(head_path)
+    base_hashes = {p: record_hash(b) for p, b in base_records.items()}
+    head_hashes = {p: record_hash(b) for p, b in head_records.items()}
+
+    known: dict[bytes, dict] = {}
+    base_sum = summarize_records(base_records, base_hashes, known)
+    head_sum = summarize_records(head_records, head_hashes, known)
+    summary = {'base': base_sum, 'head': head_sum, 'line_findings': changes is not None,
+               'records_compared': 0, 'records_unchanged': 0, 'records_skipped': 0}
+    for c, key in (('lines', 'line_coverage_pct'), ('branches', 'branch_coverage_pct'),
+                   ('functions', 'function_coverage_pct')):
+        if key in base_sum and key in head_sum:
+            summary[f'{c}_delta_pct'] = round(head_sum[key] - base_sum[key], 1)
+
+    files = []
+    for bp, hp in match_paths(base_records, head_records):
+        path = hp or bp
+        changed = None
+        if changes is not None:
+            changed = changed_lines_for(path, changes)
+            if changed is None:
+                summary['records_skipped'] += 1
+                continue
+        if bp and hp and base_hashes[bp] == head_hashes[hp]:
+            summary['records_unchanged'] += 1
+            continue
+        summary['records_compared'] += 1
+        base_cov = parse_record(bp, base_records[bp]) if bp else None
+        head_cov = parse_record(hp, head_records[hp]) if hp else None
+        entry = {'path': path, 'status': 'modified' if bp and hp else 'added' if hp else 'removed'}
+        if bp and hp and bp != hp:
+            entry['base_path'] = bp
+        entry.update(diff_file(base_cov, head_cov, changed))
+        files.append(entry)
+
+    summary['newly_uncovered_lines'] = sum(len(f['newly_uncovered_lines']) for f in files)
+    summary['newly_untaken_branches'] = sum(len(f['newly_untaken_branches']) for f in files)
+    summary['newly_uncalled_functions'] = sum(
+        1 for f in files for fn in f['functions'] if fn['status'] in ('newly_uncalled', 'added_uncalled'))
+    return {'summary': summary, 'files': files}
+
+
+def _ranges(lines: list[int]) -> str:
+    if not lines:
+        return ''
+    out = []
+    start = end = lines[0]
+    for ln in lines[1:]:
+        if ln == end + 1:
+            end = ln
+        else:
+            out.append(f'{start}' if start == end else f'{start}-{end}')
+            start = end = ln
+    out.append(f'{start}' if start == end else f'{start}-{end}')
+    return ', '.join(out)
+
+
+def _fmt_delta(value: Optional[float]) -> str:
+    return 'N/A' if value is None else f'{value:+}'
+
+
+def print_report(results: dict):
+    s = results['summary']
+    b, h = s['base'], s['head']
+    print("=" * 60)
+    print("SUI MOVE COVERAGE DIFF")
+    print("=" * 60)
+    print(f"\nLine coverage: {b.get('line_coverage_pct', 'N/A')}% -> {h.get('line_coverage_pct', 'N/A')}% "
+          f"({_fmt_delta(s.get('lines_delta_pct'))})")
+    print(f"Branch coverage: {b.get('branch_coverage_pct', 'N/A')}% -> {h.get('branch_coverage_pct', 'N/A')}% "
+          f"({_fmt_delta(s.get('branches_delta_pct'))})")
+    print(f"Function coverage: {b.get('function_coverage_pct', 'N/A')}% -> {h.get('function_coverage_pct', 'N/A')}% "
+          f"({_fmt_delta(s.get('functions_delta_pct'))})")
+    print(f"Records: {s['records_compared']} compared, {s['records_unchanged']} unchanged, "
+          f"{s['records_skipped']} outside the diff")
+    if not s['line_findings']:
+        print("Line/branch findings only for added files; pass --changes to compare changed lines")
+
+    for fd in results['files']:
+        print(f"\n{'─' * 60}")
+        print(f"  {fd['path']} ({fd['status']})")
+        cov = fd['coverage']
+        print(f"   Lines: {cov['lines']['base']} -> {cov['lines']['head']}, "
+              f"Branches: {cov['branches']['base']} -> {cov['branches']['head']}, "
+              f"Functions: {cov['functions']['base']} -> {cov['functions']['head']}")
+        if fd['newly_uncovered_lines']:
+            print(f"   Newly uncovered lines: {_ranges(fd['newly_uncovered_lines'])}")
+        if fd['newly_untaken_branches']:
+            lines = sorted({b['line'] for b in fd['newly_untaken_branches']})
+            print(f"   Newly untaken branches at lines: {_ranges(lines)}")
+        if fd['newly_covered_lines']:
+            print(f"   Newly covered lines: {_ranges(fd['newly_covered_lines'])}")
+        for fn in fd['functions']:
+            print(f"      - {fn['name']}: {fn['status']} ({fn['base_calls']} -> {fn['head_calls']} calls)")
+
+    print("\n" + "=" * 60)
+
+
+def generate_markdown(results: dict) -> str:
+    s = results['summary']
+    b, h = s['base'], s['head']
+    lines = ["# Coverage Diff", "",
+             "| Metric | Base | Head | Delta |", "|---|---:|---:|---:|"]
+    for label, key, delta in (('Lines', 'line_coverage_pct', 'lines_delta_pct'),
+                              ('Branches', 'branch_coverage_pct', 'branches_delta_pct'),
+                              ('Functions', 'function_coverage_pct', 'functions_delta_pct')):
+        lines.append(f"| {label} | {b.get(key, 'N/A')}% | {h.get(key, 'N/A')}% | {_fmt_delta(s.get(delta))} |")
+    lines.append("")
+    if not s['line_findings']:
+        lines += ["_Line and branch findings cover added files only; run with `--changes` to check changed lines._", ""]
+
+    flagged = [f for f in results['files']
+               if f['newly_uncovered_lines'] or f['newly_untaken_branches']
+               or any(fn['status'] in ('newly_uncalled', 'added_uncalled') for fn in f['functions'])]
+    if not flagged:
+        lines.append("**No newly uncovered code.**")
+        return '\n'.join(lines)
+
+    lines += ["## Newly Uncovered", ""]
+    for fd in flagged:
+        lines.append(f"### `{fd['path']}`")
+        lines.append("")
+        if fd['newly_uncovered_lines']:
+            lines.append(f"- Lines: {_ranges(fd['newly_uncovered_lines'])}")
+        if fd['newly_untaken_branches']:
+            lines.append(f"- Branches at lines: {_ranges(sorted({b['line'] for b in fd['newly_untaken_branches']}))}")
+        for fn in fd['functions']:
+            if fn['status'] in ('newly_uncalled', 'added_uncalled'):
+                lines.append(f"- [ ] `{fn['name']}()` is not called by any test")
+        lines.append("")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Diff Sui Move LCOV coverage between two runs')
+    parser.add_argument('base', help='Base lcov.info')
+    parser.add_argument('head', help='Head lcov.info')
+    parser.add_argument('--changes', '-c', help="Unified diff limiting the comparison to changed lines ('-' for stdin)")
+    parser.add_argument('--fail-on-new-uncovered', action='store_true',
+                        help='Exit with status 2 if any line, branch or function became uncovered '
+                             '(lines and branches are checked with --changes, or in added files)')
+    parser.add_argument('--json', '-j', action='store_true', help='Output as JSON')
+    parser.add_argument('--markdown', '--md', action='store_true', help='Output as Markdown')
+    parser.add_argument('--output', '-o', help='Output file path (e.g., coverage-diff.md)')
+    args = parser.parse_args()
+
+    for path in (args.base, args.head):
+        if not os.path.exists(path):
+            print(f"Error: File not found: {path}", file=sys.stderr)
+            sys.exit(1)
+
+    changes = None
+    if args.changes == '-':
+        changes = parse_unified_diff(sys.stdin)
+    elif args.changes:
+        with open(args.changes, 'r', errors='replace') as f:
+            changes = parse_unified_diff(f)
+
+    try:
+        results = diff_lcov(args.base, args.head, changes)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        result = json.dumps(results, indent=2)
+    elif args.markdown or (args.output and args.output.endswith('.md')):
+        result = generate_markdown(results)
+    else:
+        print_report(results)
+        result = None
+
+    if result is not None:
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(result)
+            print(f"Report saved to: {args.output}", file=sys.stderr)
+        else:
+            print(result)
+
+    s = results['summary']
+    if args.fail_on_new_uncovered and (s['newly_uncovered_lines'] or s['newly_untaken_branches']
+                                       or s['newly_uncalled_functions']):
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Estimate which Move functions dominate gas across the test suite.
+
+Combines per-test gas (from gas_report.py) with per-function executed
+instructions (from parse_bytecode.py), weighting each instruction by an
+opcode cost table. Each module's test gas is spread over that module's
+functions in proportion to their weighted executed instructions; gas from
+tests that don't map to a single module is spread across all modules.
+
+This is an estimate: bytecode coverage records whether an instruction ran,
+not how often, so loops and hot paths are under-weighted.
+
+Usage:
+    python3 gas_hotspots.py -m pool --cost-table costs.json --top 15 [--json | --markdown]
+    python3 gas_hotspots.py --gas gas.json -m pool -m math       # needs an existing coverage map
+    python3 gas_hotspots.py --gas gas.json --bytecode pool=pool.bytecode.txt
+
+Without --gas the tests run once with `--statistics csv --coverage`, so the
+same run supplies the gas numbers and the coverage map read by -m. With
+--gas, -m reads the coverage map from an earlier `sui move test --coverage`.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass
+from typing import Optional
+
+from analyze_source import COVERAGE_MAP, CaptureError, capture_coverage
+from gas_report import build_report, parse_gas_stream, stream_sui_tests
+from parse_bytecode import parse_bytecode_coverage
+
+OPCODE = re.compile(r'^([A-Za-z][A-Za-z0-9]*)')
+
+# Relative cost per executed instruction; unknown opcodes use the default.
+DEFAULT_COSTS = {
+    'Call': 10, 'CallGeneric': 12,
+    'Pack': 4, 'PackGeneric': 5, 'Unpack': 3, 'UnpackGeneric': 4,
+    'VecPack': 6, 'VecUnpack': 5, 'VecPushBack': 4, 'VecPopBack': 3,
+    'VecSwap': 3, 'VecLen': 2, 'VecImmBorrow': 2, 'VecMutBorrow': 2,
+    'ReadRef': 2, 'WriteRef': 3, 'FreezeRef': 1,
+    'ImmBorrowField': 2, 'MutBorrowField': 2,
+    'ImmBorrowFieldGeneric': 2, 'MutBorrowFieldGeneric': 2,
+    'ImmBorrowLoc': 1, 'MutBorrowLoc': 1,
+    'CopyLoc': 1, 'MoveLoc': 1, 'StLoc': 1, 'Pop': 1,
+    'LdU8': 1, 'LdU16': 1, 'LdU32': 1, 'LdU64': 1, 'LdU128': 2, 'LdU256': 2,
+    'LdConst': 2, 'LdTrue': 1, 'LdFalse': 1,
+    'Add': 1, 'Sub': 1, 'Mul': 2, 'Div': 3, 'Mod': 3,
+    'Lt': 1, 'Gt': 1, 'Le': 1, 'Ge': 1, 'Eq': 2, 'Neq': 2,
+    'BrTrue': 1, 'BrFalse': 1, 'Branch': 1, 'Ret': 1, 'Abort': 1,
+}
+DEFAULT_COST = 1
+
+
+@dataclass
+class Hotspot:
+    module: str
+    function: str
+    weight: float
+    executed: int
+    estimated_gas: float = 0.0
+
+
+def opcode_of(instruction: str) -> str:
+    match = OPCODE.match(instruction)
+    return match.group(1) if match else ''
+
+
+def load_cost_table(path: Optional[str]) -> dict[str, float]:
+    """Default opcode costs, overridden by entries from a JSON file."""
+    costs = dict(DEFAULT_COSTS)
+    if path:
+        with open(path, 'r') as f:
+            costs.update({k: float(v) for k, v in json.load(f).items()})
+    return costs
+
+
+def function_weights(module: str, bytecode: dict, costs: dict[str, float],
+                     default_cost: float = DEFAULT_COST) -> list[Hotspot]:
+    """Weighted executed-instruction cost of each function in one module."""
+    hotspots = []
+    for func in bytecode['functions']:
+        executed = [i for i in func['instructions'] if i['covered']]
+        weight = sum(costs.get(opcode_of(i['instruction']), default_cost) for i in executed)
+        if weight:
+            hotspots.append(Hotspot(module=module, function=func['name'],
+                                    weight=weight, executed=len(executed)))
+    return hotspots
+
+
+def tested_module(test_module: str, modules: set[str]) -> Optional[str]:
+    """Map a test module (`pool_tests`, `tests_pool`, `pool`) to a source module."""
+    if test_module in modules:
+        return test_module
+    for suffix in ('_tests', '_test'):
+        if test_module.endswith(suffix) and test_module[:-len(suffix)] in modules:
+            return test_module[:-len(suffix)]
+    for prefix in ('tests_', 'test_'):
+        if test_module.startswith(prefix) and test_module[len(prefix):] in modules:
+            return test_module[len(prefix):]
+    return None
+
+
+def attribute_gas(gas_report: dict, hotspots: list[Hotspot]) -> dict:
+    """Spread test gas over functions by weight and rank the result."""
+    by_module: dict[str, list[Hotspot]] = {}
+    for h in hotspots:
+        by_module.setdefault(h.module, []).append(h)
+    module_weight = {m: sum(h.weight for h in hs) for m, hs in by_module.items()}
+    total_weight = sum(module_weight.values())
+
+    pools = dict.fromkeys(by_module, 0)
+    shared = 0
+    for test in gas_report['tests'].values():
+        target = tested_module(test['module'], set(by_module))
+        if target is None:
+            shared += test['gas']
+        else:
+            pools[target] += test['gas']
+
+    for m, hs in by_module.items():
+        for h in hs:
+            h.estimated_gas = pools[m] * h.weight / module_weight[m]
+            if total_weight:
+                h.estimated_gas += shared * h.weight / total_weight
+
+    attributed = sum(h.estimated_gas for h in hotspots)
+    ranked = sorted(hotspots, key=lambda h: -h.estimated_gas)
+    return {
+        'summary': {
+            'total_gas': gas_report['summary']['total_gas'],
+            'attributed_gas': round(attributed),
+            'module_gas': pools,
+            'shared_gas': shared,
+            'functions': len(ranked),
+        },
+        'hotspots': [
+            {'rank': i, 'module': h.module, 'function': h.function,
+             'estimated_gas': round(h.estimated_gas),
+             'share_pct': round(100 * h.estimated_gas / attributed, 2) if attributed else 0.0,
+             'weight': h.weight, 'executed_instructions': h.executed}
+            for i, h in enumerate(ranked, 1)
+        ],
+    }
+
+
+def generate_markdown(results: dict, top: int = 20) -> str:
+    s = results['summary']
+    lines = ["# Gas Hotspots", "",
+             f"**{s['attributed_gas']:,} of {s['total_gas']:,} gas attributed across {s['functions']} functions**", "",
+             "| # | Function | Est. gas | Share | Executed instrs |", "|---:|---|---:|---:|---:|"]
+    for h in results['hotspots'][:top]:
+        lines.append(f"| {h['rank']} | `{h['module']}::{h['function']}` | {h['estimated_gas']:,} | "
+                     f"{h['share_pct']}% | {h['executed_instructions']} |")
+    lines.append("")
+    return '\n'.join(lines)
+
+
+def print_report(results: dict, top: int = 20):
+    s = results['summary']
+    print("=" * 70)
+    print("GAS HOTSPOTS (estimated)")
+    print("=" * 70)
+    print(f"\nTotal test gas: {s['total_gas']:,}")
+    print(f"Attributed:     {s['attributed_gas']:,} across {s['functions']} functions")
+    if s['shared_gas']:
+        print(f"Shared (tests not mapped to one module): {s['shared_gas']:,}")
+    print("\n" + "-" * 70)
+    print(f"  {'#':>3}  {'Function':<40} {'Est. gas':>14} {'Share':>7}")
+    print("-" * 70)
+    for h in results['hotspots'][:top]:
+        name = f"{h['module']}::{h['function']}"
+        print(f"  {h['rank']:>3}  {name:<40} {h['estimated_gas']:>14,} {h['share_pct']:>6}%")
+    print("\n" + "=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank Move functions by estimated gas')
+    parser.add_argument('--gas', '-g', help='gas_report.py JSON (default: run sui move test --statistics csv --coverage)')
+    parser.add_argument('--module', '-m', action='append', default=[], dest='modules',
+                        help='Module to capture bytecode coverage for (repeatable; with --gas, needs an existing coverage map)')
+    parser.add_argument('--bytecode', action='append', default=[], metavar='MODULE=FILE',
+                        help='Saved `sui move coverage bytecode` output for a module (repeatable)')
+    parser.add_argument('--path', '-p', default='.', help='Package path (default: current dir)')
+    parser.add_argument('--sui', default=os.environ.get('SUI_BIN', 'sui'), help='sui executable (default: $SUI_BIN or sui)')
+    parser.add_argument('--cost-table', help='JSON object of opcode -> cost overriding the defaults')
+    parser.add_argument('--default-cost', type=float, default=DEFAULT_COST, help='Cost of opcodes missing from the table')
+    parser.add_argument('--top', type=int, default=20, help='Number of hotspots to show')
+    parser.add_argument('--json', '-j', action='store_true', help='Output as JSON')
+    parser.add_argument('--markdown', '--md', action='store_true', help='Output as Markdown')
+    parser.add_argument('--output', '-o', help='Output file path (e.g., hotspots.md)')
+    args = parser.parse_args()
+
+    if not args.modules and not args.bytecode:
+        print("Error: pass at least one --module or --bytecode MODULE=FILE", file=sys.stderr)
+        sys.exit(1)
+
+    if args.gas and args.modules and not os.path.exists(os.path.join(args.path, COVERAGE_MAP)):
+        print(f"Error: {COVERAGE_MAP} not found in {args.path}; run `sui move test --coverage` "
+              "first or omit --gas", file=sys.stderr)
+        sys.exit(1)
+
+    if args.gas:
+        with open(args.gas, 'r') as f:
+            gas_report = json.load(f)
+    else:
+        print(f"Running: {args.sui} move test --statistics csv --coverage", file=sys.stderr)
+        try:
+            gas_report = build_report(parse_gas_stream(stream_sui_tests(args.path, args.sui, ['--coverage'])))
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    captures = {}
+    for spec in args.bytecode:
+        module, sep, path = spec.partition('=')
+        if not sep:
+            print(f"Error: --bytecode expects MODULE=FILE, got {spec}", file=sys.stderr)
+            sys.exit(1)
+        with open(path, 'r', errors='replace') as f:
+            captures[module] = f.read()
+    for module in args.modules:
+        try:
+            captures[module] = capture_coverage('bytecode', module, args.path, args.sui, announce=True)
+        except (CaptureError, OSError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    costs = load_cost_table(args.cost_table)
+    hotspots = []
+    for module, text in captures.items():
+        hotspots += function_weights(module, parse_bytecode_coverage(text), costs, args.default_cost)
+
+    results = attribute_gas(gas_report, hotspots)
+
+    if args.json:
+        result = json.dumps(results, indent=2)
+    elif args.markdown or (args.output and args.output.endswith('.md')):
+        result = generate_markdown(results, args.top)
+    else:
+        print_report(results, args.top)
+        return
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(result)
+        print(f"Report saved to: {args.output}", file=sys.stderr)
+    else:
+        print(result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Sui Move gas profiler with baseline regression checks.
+
+Streams `sui move test --statistics` output, extracts per-test gas, aggregates
+it per module and compares against a stored baseline JSON.
+
+Usage:
+    python3 gas_report.py [--path <package_path>]            # runs sui move test --statistics
+    sui move test --statistics csv | python3 gas_report.py -i -
+    python3 gas_report.py --save-baseline gas-baseline.json
+    python3 gas_report.py --baseline gas-baseline.json --threshold 5 --fail-on-regression
+    python3 gas_report.py --json | --markdown [-o gas.md]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+# Table row: "│ 0x0::pool_tests::test_swap │ 0.003 │ 12345 │"
+TABLE_ROW = re.compile(r'^\s*[│|]\s*(\S+::\S+)\s*[│|]\s*([\d.]+)\s*[│|]\s*(\d+)\s*[│|]')
+# CSV row from `--statistics csv`: "0x0::pool_tests::test_swap,3000,12345"
+CSV_ROW = re.compile(r'^\s*(\S+::[^,\s]+),\s*([\d.]+),\s*(\d+)\s*$')
+TEST_STATUS = re.compile(r'^\s*\[\s*(PASS|FAIL|TIMEOUT)\s*\]\s+(\S+)')
+
+
+@dataclass
+class TestGas:
+    name: str
+    module: str
+    gas: int
+    time: float = 0.0
+    status: Optional[str] = None
+
+
+@dataclass
+class ModuleGas:
+    name: str
+    tests: int = 0
+    total_gas: int = 0
+    max_gas: int = 0
+    max_test: str = ''
+
+    @property
+    def mean_gas(self) -> float:
+        return self.total_gas / self.tests if self.tests else 0.0
+
+
+@dataclass
+class GasProfile:
+    tests: dict[str, TestGas] = field(default_factory=dict)
+    statuses: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def total_gas(self) -> int:
+        return sum(t.gas for t in self.tests.values())
+
+
+def module_of(test_name: str) -> str:
+    """`0x0::pool_tests::test_swap` -> `pool_tests`."""
+    parts = test_name.split('::')
+    return parts[-2] if len(parts) >= 2 else ''
+
+
+def parse_gas_stream(lines: Iterable[str]) -> GasProfile:
+    """Extract per-test gas and PASS/FAIL status from streamed test output."""
+    profile = GasProfile()
+    for line in lines:
+        if '::' not in line:
+            continue
+        match = TEST_STATUS.match(line)
+        if match:
+            profile.statuses[match.group(2)] = match.group(1)
+            continue
+        match = TABLE_ROW.match(line) or CSV_ROW.match(line)
+        if match:
+            name = match.group(1)
+            profile.tests[name] = TestGas(name=name, module=module_of(name),
+                                          gas=int(match.group(3)), time=float(match.group(2)))
+    for name, status in profile.statuses.items():
+        if name in profile.tests:
+            profile.tests[name].status = status
+    return profile
+
+
+def stream_sui_tests(package_path: str = '.', sui_bin: str = 'sui',
+                     extra_args: Optional[list[str]] = None):
+    """Run `sui move test --statistics csv` and yield output lines as they arrive."""
+    argv = [sui_bin, 'move', 'test', '--statistics', 'csv'] + (extra_args or [])
+    proc = subprocess.Popen(argv, cwd=package_path, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, text=True, errors='replace', bufsize=1)
+    try:
+        yield from proc.stdout
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+
+def echo_lines(lines: Iterable[str]):
+    """Pass lines through unchanged, echoing each to stderr."""
+    for line in lines:
+        sys.stderr.write(line)
+        yield line
+
+
+def aggregate_modules(profile: GasProfile) -> dict[str, ModuleGas]:
+    modules = {}
+    for t in profile.tests.values():
+        m = modules.get(t.module)
+        if m is None:
+            m = modules[t.module] = ModuleGas(name=t.module)
+        m.tests += 1
+        m.total_gas += t.gas
+        if t.gas > m.max_gas:
+            m.max_gas, m.max_test = t.gas, t.name
+    return modules
+
+
+def _delta(old: int, new: int) -> dict:
+    pct = round(100 * (new - old) / old, 2) if old else None
+    return {'baseline': old, 'current': new, 'delta': new - old, 'delta_pct': pct}
+
+
+def _is_regression(old: int, new: int, pct_threshold: float, abs_threshold: int) -> bool:
+    if new - old <= abs_threshold:
+        return False
+    return old == 0 or 100 * (new - old) / old > pct_threshold
+
+
+def compare_baseline(current: dict, baseline: dict, pct_threshold: float = 5.0,
+                     abs_threshold: int = 0) -> dict:
+    """Compare a report against a baseline report produced by `build_report`.
+
+    A test or module regresses when its gas grows by more than `abs_threshold`
+    units and by more than `pct_threshold` percent.
+    """
+    base_tests = baseline.get('tests', {})
+    base_modules = baseline.get('modules', {})
+    result = {'threshold_pct': pct_threshold, 'threshold_abs': abs_threshold,
+              'regressions': [], 'improvements': [], 'module_regressions': [],
+              'new_tests': [], 'removed_tests': sorted(set(base_tests) - set(current['tests']))}
+
+    for name, t in current['tests'].items():
+        if name not in base_tests:
+            result['new_tests'].append(name)
+            continue
+        old, new = base_tests[name]['gas'], t['gas']
+        if _is_regression(old, new, pct_threshold, abs_threshold):
+            result['regressions'].append({'test': name, **_delta(old, new)})
+        elif new < old:
+            result['improvements'].append({'test': name, **_delta(old, new)})
+
+    for name, m in current['modules'].items():
+        if name in base_modules:
+            old, new = base_modules[name]['total_gas'], m['total_gas']
+            if _is_regression(old, new, pct_threshold, abs_threshold):
+                result['module_regressions'].append({'module': name, **_delta(old, new)})
+
+    result['regressions'].sort(key=lambda r: -r['delta'])
+    result['improvements'].sort(key=lambda r: r['delta'])
+    result['module_regressions'].sort(key=lambda r: -r['delta'])
+    return result
+
+
+def build_report(profile: GasProfile) -> dict:
+    """Build the JSON-serializable report (also the baseline file format)."""
+    modules = aggregate_modules(profile)
+    failed = sorted(n for n, s in profile.statuses.items() if s != 'PASS')
+    return {
+        'summary': {
+            'total_tests': len(profile.tests),
+            'total_gas': profile.total_gas,
+            'modules': len(modules),
+            'failed_tests': failed,
+        },
+        'modules': {
+            name: {'tests': m.tests, 'total_gas': m.total_gas, 'mean_gas': round(m.mean_gas, 1),
+                   'max_gas': m.max_gas, 'max_test': m.max_test}
+            for name, m in sorted(modules.items(), key=lambda kv: -kv[1].total_gas)
+        },
+        'tests': {
+            t.name: {'module': t.module, 'gas': t.gas, 'time': t.time, 'status': t.status}
+            for t in sorted(profile.tests.values(), key=lambda t: -t.gas)
+        },
+    }
+
+
+def generate_markdown(report: dict, top: int = 20) -> str:
+    s = report['summary']
+    lines = ["# Gas Report", "",
+             f"**{s['total_tests']} tests, {s['modules']} modules, {s['total_gas']:,} total gas**", ""]
+
+    if s['failed_tests']:
+        lines.append(f"> {len(s['failed_tests'])} failing test(s); their gas may be incomplete.")
+        lines.append("")
+
+    lines += ["## Modules", "", "| Module | Tests | Total gas | Mean gas | Max gas |",
+              "|---|---:|---:|---:|---:|"]
+    for name, m in report['modules'].items():
+        lines.append(f"| `{name}` | {m['tests']} | {m['total_gas']:,} | {m['mean_gas']:,.0f} | {m['max_gas']:,} |")
+    lines.append("")
+
+    lines += [f"## Top {top} Tests", "", "| Test | Gas |", "|---|---:|"]
+    for name, t in list(report['tests'].items())[:top]:
+        lines.append(f"| `{name}` | {t['gas']:,} |")
+    lines.append("")
+
+    cmp = report.get('comparison')
+    if cmp:
+        lines += ["## Baseline Comparison", "",
+                  f"Threshold: >{cmp['threshold_pct']}% and >{cmp['threshold_abs']} gas", ""]
+        if cmp['regressions']:
+            lines += ["### Regressions", "", "| Test | Baseline | Current | Delta |", "|---|---:|---:|---:|"]
+            for r in cmp['regressions']:
+                pct = f" ({r['delta_pct']:+}%)" if r['delta_pct'] is not None else ''
+                lines.append(f"| `{r['test']}` | {r['baseline']:,} | {r['current']:,} | {r['delta']:+,}{pct} |")
+            lines.append("")
+        else:
+            lines += ["No gas regressions.", ""]
+        if cmp['module_regressions']:
+            lines += ["### Module Regressions", ""]
+            for r in cmp['module_regressions']:
+                lines.append(f"- `{r['module']}`: {r['baseline']:,} -> {r['current']:,} ({r['delta']:+,})")
+            lines.append("")
+        if cmp['new_tests'] or cmp['removed_tests']:
+            lines.append(f"New tests: {len(cmp['new_tests'])}, removed tests: {len(cmp['removed_tests'])}")
+            lines.append("")
+
+    return '\n'.join(lines)
+
+
+def print_report(report: dict, top: int = 20):
+    s = report['summary']
+    print("=" * 60)
+    print("SUI MOVE GAS REPORT")
+    print("=" * 60)
+    print(f"\nTests: {s['total_tests']}  Modules: {s['modules']}  Total gas: {s['total_gas']:,}")
+    if s['failed_tests']:
+        print(f"Failed tests: {len(s['failed_tests'])} (gas may be incomplete)")
+
+    print("\n" + "-" * 60)
+    print("MODULES")
+    print("-" * 60)
+    for name, m in report['modules'].items():
+        print(f"  {name:<30} {m['tests']:>5} tests {m['total_gas']:>15,} gas")
+
+    print("\n" + "-" * 60)
+    print(f"TOP {top} TESTS")
+    print("-" * 60)
+    for name, t in list(report['tests'].items())[:top]:
+        print(f"  {name:<45} {t['gas']:>13,}")
+
+    cmp = report.get('comparison')
+    if cmp:
+        print("\n" + "-" * 60)
+        print(f"BASELINE COMPARISON (>{cmp['threshold_pct']}% and >{cmp['threshold_abs']} gas)")
+        print("-" * 60)
+        if not cmp['regressions'] and not cmp['module_regressions']:
+            print("  No gas regressions.")
+        for r in cmp['regressions']:
+            pct = f" ({r['delta_pct']:+}%)" if r['delta_pct'] is not None else ''
+            print(f"  [REGRESSION] {r['test']}: {r['baseline']:,} -> {r['current']:,}{pct}")
+        for r in cmp['module_regressions']:
+            print(f"  [MODULE] {r['module']}: {r['baseline']:,} -> {r['current']:,} ({r['delta']:+,})")
+        if cmp['improvements']:
+            print(f"  {len(cmp['improvements'])} test(s) improved")
+        if cmp['new_tests'] or cmp['removed_tests']:
+            print(f"  New tests: {len(cmp['new_tests'])}, removed tests: {len(cmp['removed_tests'])}")
+
+    print("\n" + "=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile Sui Move test gas and check for regressions')
+    parser.add_argument('--path', '-p', default='.', help='Package path (default: current dir)')
+    parser.add_argument('--input', '-i', help="Read saved test output instead of running sui ('-' for stdin)")
+    parser.add_argument('--sui', default=os.environ.get('SUI_BIN', 'sui'), help='sui executable (default: $SUI_BIN or sui)')
+    parser.add_argument('--gas-limit', type=int, help='Pass --gas-limit to sui move test')
+    parser.add_argument('--baseline', '-b', help='Baseline JSON to compare against')
+    parser.add_argument('--save-baseline', help='Write this run as a baseline JSON')
+    parser.add_argument('--threshold', '-t', type=float, default=5.0, help='Regression threshold in percent (default: 5)')
+    parser.add_argument('--abs-threshold', type=int, default=0, help='Ignore increases of at most this many gas units')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit with status 2 on any regression')
+    parser.add_argument('--top', type=int, default=20, help='Number of most expensive tests to list')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Echo the raw test output to stderr as it streams')
+    parser.add_argument('--json', '-j', action='store_true', help='Output as JSON')
+    parser.add_argument('--markdown', '--md', action='store_true', help='Output as Markdown')
+    parser.add_argument('--output', '-o', help='Output file path (e.g., gas.md)')
+    args = parser.parse_args()
+
+    source = echo_lines if args.verbose else iter
+    try:
+        if args.input == '-':
+            profile = parse_gas_stream(source(sys.stdin))
+        elif args.input:
+            with open(args.input, 'r', errors='replace') as f:
+                profile = parse_gas_stream(source(f))
+        else:
+            extra = ['--gas-limit', str(args.gas_limit)] if args.gas_limit else []
+            print(f"Running: {args.sui} move test --statistics csv", file=sys.stderr)
+            profile = parse_gas_stream(source(stream_sui_tests(args.path, args.sui, extra)))
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if not profile.tests:
+        print("Error: no per-test gas found (expected `sui move test --statistics` output)", file=sys.stderr)
+        sys.exit(1)
+
+    report = build_report(profile)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to: {args.save_baseline}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            report['comparison'] = compare_baseline(report, json.load(f), args.threshold, args.abs_threshold)
+
+    if args.json:
+        result = json.dumps(report, indent=2)
+    elif args.markdown or (args.output and args.output.endswith('.md')):
+        result = generate_markdown(report, args.top)
+    else:
+        print_report(report, args.top)
+        result = None
+
+    if result is not None:
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(result)
+            print(f"Report saved to: {args.output}", file=sys.stderr)
+        else:
+            print(result)
+
+    cmp = report.get('comparison')
+    if args.fail_on_regression and cmp and (cmp['regressions'] or cmp['module_regressions']):
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
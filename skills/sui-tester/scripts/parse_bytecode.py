@@ -13,6 +13,10 @@ import json
 from dataclasses import dataclass
 from typing import Optional
 
+FUNC_HEADER = re.compile(r'^(?:public\s+)?(\w+)\s*\([^)]*\)(?:\s*:\s*\w+)?\s*\{')
+SOURCE_LINE = re.compile(r'\[(\d+)\]\s*\t')
+INSTRUCTION = re.compile(r'(\d+):\s+(.+?)(?:\033\[|$)')
+
 
 def parse_bytecode_coverage(input_text: str) -> dict:
     """Parse bytecode coverage output and return structured data."""
@@ -27,7 +31,7 @@ def parse_bytecode_coverage(input_text: str) -> dict:
     lines = input_text.split('\n')
 
     for line in lines:
-        func_match = re.match(r'^(?:public\s+)?(\w+)\s*\([^)]*\)(?:\s*:\s*\w+)?\s*\{', line.strip())
+        func_match = FUNC_HEADER.match(line.strip())
         if func_match:
             if current_function and current_instructions:
                 results['functions'].append({
@@ -48,11 +52,11 @@ def parse_bytecode_coverage(input_text: str) -> dict:
 
         if is_covered is not None:
             source_line = None
-            line_match = re.search(r'\[(\d+)\]\s*\t', line)
+            line_match = SOURCE_LINE.search(line)
             if line_match:
                 source_line = int(line_match.group(1))
 
-            instr_match = re.search(r'(\d+):\s+(.+?)(?:\033\[|$)', line)
+            instr_match = INSTRUCTION.search(line)
             if instr_match:
                 instr_data = {
                     'source_line': source_line,
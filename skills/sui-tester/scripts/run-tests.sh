@@ -1,11 +1,9 @@
 #!/bin/bash
-echo "🧪 Running test suite..."
+echo "🧪 Running test suite with coverage..."
 
-echo "1️⃣ Unit tests..."
-sui move test
+# Single `sui move test --coverage` pass, then LCOV/source/bytecode analyses in parallel
+python3 "$(dirname "$0")/run_tests.py" "$@"
+STATUS=$?
 
-echo "2️⃣ Coverage..."
-sui move test --coverage
-sui move coverage summary
-
-echo "✅ Tests complete"
+[ $STATUS -eq 0 ] && echo "✅ Tests complete" || echo "❌ Tests failed"
+exit $STATUS
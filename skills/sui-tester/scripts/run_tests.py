@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Run the Sui Move test suite once with coverage, then fan out coverage analyses.
+
+Streams test results as `sui move test --coverage` reports them, writes
+lcov.info, and runs the LCOV, source and bytecode analyses for affected
+modules concurrently in a worker pool. Produces one combined report.
+
+Usage:
+    python3 run_tests.py [--path <package_path>] [--json] [-o report.json]
+    python3 run_tests.py -m pool -m math --jobs 4
+    python3 run_tests.py --sui ./stub-sui        # or SUI_BIN=./stub-sui
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from analyze_lcov import analyze
+from analyze_source import capture_coverage, parse_colored_output, uncovered_to_dict
+from parse_bytecode import parse_bytecode_coverage
+
+TEST_RESULT = re.compile(r'^\s*\[\s*(PASS|FAIL|TIMEOUT)\s*\]\s+(\S+)')
+TEST_SUMMARY = re.compile(r'Test result:\s*(\w+)\.\s*Total tests:\s*(\d+);\s*passed:\s*(\d+);\s*failed:\s*(\d+)')
+MODULE_DECL = re.compile(r'^\s*module\s+(?:\w+::)?(\w+)\s*[{;]', re.MULTILINE)
+
+
+def default_sui_bin() -> str:
+    return os.environ.get('SUI_BIN', 'sui')
+
+
+def run_test_pass(package_path: str = '.', sui_bin: str = 'sui',
+                  on_result: Optional[Callable[[dict], None]] = None) -> dict:
+    """Run `sui move test --coverage` once, reporting each test as it completes."""
+    tests = {'results': [], 'passed': 0, 'failed': 0, 'total': 0, 'status': None, 'exit_code': None}
+    proc = subprocess.Popen([sui_bin, 'move', 'test', '--coverage'], cwd=package_path,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, errors='replace', bufsize=1)
+    for line in proc.stdout:
+        match = TEST_RESULT.match(line)
+        if match:
+            result = {'name': match.group(2), 'status': match.group(1)}
+            tests['results'].append(result)
+            if match.group(1) == 'PASS':
+                tests['passed'] += 1
+            else:
+                tests['failed'] += 1
+            if on_result:
+                on_result(result)
+            continue
+        match = TEST_SUMMARY.search(line)
+        if match:
+            tests['status'] = match.group(1)
+    tests['exit_code'] = proc.wait()
+    tests['total'] = len(tests['results'])
+    if tests['status'] is None:
+        tests['status'] = 'OK' if tests['exit_code'] == 0 else 'FAILED'
+    return tests
+
+
+def write_lcov(package_path: str = '.', sui_bin: str = 'sui') -> Optional[str]:
+    """Export lcov.info from the coverage map left by the test pass."""
+    proc = subprocess.run([sui_bin, 'move', 'coverage', 'lcov'], cwd=package_path,
+                          stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors='replace')
+    lcov_path = os.path.join(package_path, 'lcov.info')
+    if proc.returncode != 0 or not os.path.exists(lcov_path):
+        return None
+    return lcov_path
+
+
+def module_names(source_path: str) -> List[str]:
+    """Module names declared in a Move source file (`module addr::name {` or `;`)."""
+    with open(source_path, 'r', encoding='utf-8', errors='replace') as f:
+        return MODULE_DECL.findall(f.read())
+
+
+def affected_modules(lcov_results: dict, source_dir: Optional[str] = None) -> Tuple[List[str], List[dict]]:
+    """Modules declared in source files that have any coverage gap.
+
+    Names come from the `module` declarations in each file (found at its LCOV
+    path or by basename under source_dir). When the source can't be read the
+    file basename is used and an error is returned alongside the modules.
+    """
+    modules, errors = [], []
+    for fd in lcov_results['files']:
+        if not (fd['uncovered_lines'] or fd['untaken_branches'] or fd['uncalled_functions']):
+            continue
+        candidates = [fd['path']]
+        if source_dir:
+            candidates.insert(0, os.path.join(source_dir, os.path.basename(fd['path'])))
+        names = None
+        for candidate in candidates:
+            if os.path.exists(candidate):
+                try:
+                    names = module_names(candidate)
+                except OSError:
+                    continue
+                break
+        if not names:
+            names = [os.path.splitext(os.path.basename(fd['path']))[0]]
+            errors.append({'analysis': 'modules', 'module': names[0],
+                           'error': f"no module declaration read from {fd['path']}; assuming the file basename"})
+        for name in names:
+            if name not in modules:
+                modules.append(name)
+    return modules, errors
+
+
+def source_analysis(module: str, package_path: str, sui_bin: str) -> dict:
+    uncovered = parse_colored_output(capture_coverage('source', module, package_path, sui_bin))
+    return uncovered_to_dict(module, uncovered)
+
+
+def bytecode_analysis(module: str, package_path: str, sui_bin: str) -> dict:
+    return parse_bytecode_coverage(capture_coverage('bytecode', module, package_path, sui_bin))
+
+
+def run_analyses(package_path: str, lcov_path: Optional[str], sui_bin: str,
+                 modules: Optional[List[str]] = None, jobs: int = 4,
+                 source_dir: Optional[str] = None) -> dict:
+    """Run LCOV, source and bytecode analyses concurrently and merge the results.
+
+    The sui captures for a package are serialized by capture_coverage, so
+    jobs > 1 overlaps their parsing and the LCOV analysis, not the sui runs.
+
+    Without an explicit module list, the LCOV analysis runs first so its
+    coverage gaps can pick the modules to inspect.
+    """
+    report = {'lcov': None, 'modules': {}, 'errors': []}
+
+    def collect(key: str, future, module: Optional[str] = None):
+        try:
+            result = future.result()
+        except Exception as e:
+            err = {'analysis': key, 'error': str(e)}
+            if module:
+                err['module'] = module
+            report['errors'].append(err)
+            return
+        if module:
+            report['modules'][module][key] = result
+        else:
+            report[key] = result
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        lcov_future = pool.submit(analyze, lcov_path, source_dir) if lcov_path else None
+        if modules is None:
+            if lcov_future is not None:
+                collect('lcov', lcov_future)
+                lcov_future = None
+            modules = []
+            if report['lcov']:
+                modules, errors = affected_modules(report['lcov'], source_dir)
+                report['errors'].extend(errors)
+
+        futures = []
+        for module in modules:
+            report['modules'][module] = {'source': None, 'bytecode': None}
+            futures.append(('source', pool.submit(source_analysis, module, package_path, sui_bin), module))
+            futures.append(('bytecode', pool.submit(bytecode_analysis, module, package_path, sui_bin), module))
+
+        if lcov_future is not None:
+            collect('lcov', lcov_future)
+        for key, future, module in futures:
+            collect(key, future, module)
+
+    return report
+
+
+def run_pipeline(package_path: str = '.', sui_bin: str = 'sui', modules: Optional[List[str]] = None,
+                 jobs: int = 4, source_dir: Optional[str] = None,
+                 on_result: Optional[Callable[[dict], None]] = None) -> dict:
+    """Single test pass with coverage followed by the parallel analysis fan-out."""
+    tests = run_test_pass(package_path, sui_bin, on_result)
+    lcov_path = write_lcov(package_path, sui_bin)
+    if source_dir is None and os.path.isdir(os.path.join(package_path, 'sources')):
+        source_dir = os.path.join(package_path, 'sources')
+    report = run_analyses(package_path, lcov_path, sui_bin, modules, jobs, source_dir)
+    if lcov_path is None:
+        report['errors'].append({'analysis': 'lcov', 'error': 'sui move coverage lcov produced no lcov.info'})
+    return {'package': os.path.abspath(package_path), 'tests': tests, **report}
+
+
+def print_report(report: dict):
+    """Print the combined report in human-readable form."""
+    t = report['tests']
+    print("=" * 60)
+    print("SUI MOVE TEST + COVERAGE REPORT")
+    print("=" * 60)
+    print(f"\nPackage: {report['package']}")
+    print(f"Tests: {t['passed']}/{t['total']} passed, {t['failed']} failed ({t['status']})")
+
+    failed = [r['name'] for r in t['results'] if r['status'] != 'PASS']
+    if failed:
+        print("\n   Failed tests:")
+        for name in failed:
+            print(f"      - {name}")
+
+    if report['lcov']:
+        s = report['lcov']['summary']
+        print(f"\nFunction coverage: {s['total_functions_hit']}/{s['total_functions_found']} ({s.get('function_coverage_pct', 'N/A')}%)")
+        print(f"Line coverage: {s['total_lines_hit']}/{s['total_lines_found']} ({s.get('line_coverage_pct', 'N/A')}%)")
+        print(f"Branch coverage: {s['total_branches_hit']}/{s['total_branches_found']} ({s.get('branch_coverage_pct', 'N/A')}%)")
+
+    for module, data in report['modules'].items():
+        print(f"\n{'─' * 60}")
+        print(f"  {module}")
+        if data['source'] is not None:
+            print(f"   Uncovered source segments: {data['source']['uncovered_count']}")
+            for seg in data['source']['uncovered'][:10]:
+                print(f"      - Line {seg['line']}: {seg['uncovered_text']}")
+        if data['bytecode'] is not None:
+            bs = data['bytecode']['summary']
+            print(f"   Bytecode: {bs['covered_instructions']}/{bs['total_instructions']} instructions covered")
+
+    if report['errors']:
+        print(f"\n{'─' * 60}")
+        print("  Errors:")
+        for err in report['errors']:
+            where = f"{err['analysis']} ({err['module']})" if 'module' in err else err['analysis']
+            print(f"      - {where}: {err['error']}")
+
+    print("\n" + "=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run Sui Move tests once with coverage and analyze the results')
+    parser.add_argument('--path', '-p', default='.', help='Package path (default: current dir)')
+    parser.add_argument('--module', '-m', action='append', dest='modules',
+                        help='Module to analyze (repeatable; default: modules with coverage gaps)')
+    parser.add_argument('--source-dir', '-s', help='Directory containing Move source files')
+    parser.add_argument('--jobs', '-J', type=int, default=4, help='Analysis worker count (default: 4)')
+    parser.add_argument('--sui', default=default_sui_bin(), help='sui executable (default: $SUI_BIN or sui)')
+    parser.add_argument('--json', '-j', action='store_true', help='Output as JSON')
+    parser.add_argument('--output', '-o', help='Write the report to a file')
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(args.path, 'Move.toml')):
+        print(f"Error: Move.toml not found in {args.path}", file=sys.stderr)
+        sys.exit(1)
+
+    def on_result(result: dict):
+        print(f"[ {result['status']:<7} ] {result['name']}", file=sys.stderr, flush=True)
+
+    print(f"Running: {args.sui} move test --coverage", file=sys.stderr)
+    try:
+        report = run_pipeline(args.path, args.sui, args.modules, args.jobs, args.source_dir, on_result)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json or args.output:
+        result = json.dumps(report, indent=2)
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(result)
+            print(f"Report saved to: {args.output}", file=sys.stderr)
+        else:
+            print(result)
+    else:
+        print_report(report)
+
+    sys.exit(0 if report['tests']['failed'] == 0 and report['tests']['exit_code'] == 0 else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the sui-tester scripts.
+
+Subcommands are imported lazily, so each one only pays for the modules it
+uses. `--serve-stdio` keeps one warm process that answers newline-delimited
+JSON requests, reusing imported parsers, compiled regexes and result caches
+across requests.
+
+Usage:
+    python3 sui_coverage.py lcov lcov.info --summary-only
+    python3 sui_coverage.py source -m pool --json
+    sui move coverage bytecode --module pool | python3 sui_coverage.py bytecode --json
+    python3 sui_coverage.py --serve-stdio
+
+Request / response format for --serve-stdio (one JSON object per line):
+    {"id": 1, "cmd": "lcov", "params": {"path": "lcov.info", "summary_only": true}}
+    {"id": 1, "ok": true, "result": {...}}
+    {"id": 2, "ok": false, "error": "..."}
+
+Commands: lcov, diff, source, bytecode, ansi, ping, shutdown. Text inputs
+for source/bytecode/ansi are passed as "text" or read from "file"; source
+and bytecode can also capture from sui with "module" (plus optional "path").
+diff takes "base", "head" and optionally "changes" (unified diff text) or
+"changes_file".
+"""
+
+import os
+import sys
+
+COMMANDS = {
+    'lcov': ('analyze_lcov', 'Analyze an lcov.info file'),
+    'diff': ('diff_lcov', 'Diff coverage between two lcov.info files'),
+    'source': ('analyze_source', 'Source coverage for one module (PTY capture)'),
+    'bytecode': ('parse_bytecode', 'Parse piped `sui move coverage bytecode` output'),
+    'ansi': ('parse_source', 'Parse piped `sui move coverage source` output'),
+    'test': ('run_tests', 'Run tests once with coverage and analyze'),
+    'gas': ('gas_report', 'Per-test gas report with baseline comparison'),
+    'hotspots': ('gas_hotspots', 'Rank functions by estimated gas'),
+    'workspace': ('workspace', 'Coverage across every package under a root'),
+}
+
+_lcov_cache: dict = {}
+
+
+def _read_text(params: dict) -> str:
+    if 'text' in params:
+        return params['text']
+    if 'file' in params:
+        with open(params['file'], 'r', encoding='utf-8', errors='replace') as f:
+            return f.read()
+    raise ValueError("expected 'text' or 'file'")
+
+
+def _capture(kind: str, params: dict) -> str:
+    if 'text' in params or 'file' in params:
+        return _read_text(params)
+    if 'module' not in params:
+        raise ValueError("expected 'text', 'file' or 'module'")
+    from analyze_source import capture_coverage
+    return capture_coverage(kind, params['module'], params.get('path', '.'),
+                            params.get('sui', os.environ.get('SUI_BIN', 'sui')))
+
+
+def handle_lcov(params: dict) -> dict:
+    from analyze_lcov import analyze, check_fail_under, parse_fail_under, summarize_lcov
+    path = params['path']
+    summary_only = bool(params.get('summary_only'))
+    source_dir = params.get('source_dir')
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size, source_dir, summary_only)
+    result = _lcov_cache.get(key)
+    if result is None:
+        if summary_only:
+            result = {'summary': summarize_lcov(path), 'files': []}
+        else:
+            result = analyze(path, source_dir)
+        _lcov_cache.clear()
+        _lcov_cache[key] = result
+    if params.get('fail_under'):
+        result = dict(result, failures=check_fail_under(result['summary'], parse_fail_under(params['fail_under'])))
+    return result
+
+
+def handle_diff(params: dict) -> dict:
+    from diff_lcov import diff_lcov, parse_unified_diff
+    changes = None
+    if 'changes' in params:
+        changes = parse_unified_diff(params['changes'].splitlines(keepends=True))
+    elif 'changes_file' in params:
+        with open(params['changes_file'], 'r', errors='replace') as f:
+            changes = parse_unified_diff(f)
+    return diff_lcov(params['base'], params['head'], changes)
+
+
+def handle_source(params: dict) -> dict:
+    from analyze_source import parse_colored_output, uncovered_to_dict
+    return uncovered_to_dict(params.get('module', ''), parse_colored_output(_capture('source', params)))
+
+
+def handle_bytecode(params: dict) -> dict:
+    from parse_bytecode import parse_bytecode_coverage
+    return parse_bytecode_coverage(_capture('bytecode', params))
+
+
+def handle_ansi(params: dict) -> dict:
+    from parse_source import analyze_coverage
+    return analyze_coverage(_read_text(params))
+
+
+HANDLERS = {
+    'lcov': handle_lcov,
+    'diff': handle_diff,
+    'source': handle_source,
+    'bytecode': handle_bytecode,
+    'ansi': handle_ansi,
+    'ping': lambda params: {'pong': True},
+}
+
+
+def serve_stdio(stdin=None, stdout=None):
+    """Answer newline-delimited JSON requests until EOF or a shutdown request."""
+    import json
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    for line in stdin:
+        if not line.strip():
+            continue
+        req_id = None
+        try:
+            req = json.loads(line)
+            req_id = req.get('id')
+            cmd = req['cmd']
+            if cmd == 'shutdown':
+                stdout.write(json.dumps({'id': req_id, 'ok': True, 'result': None}) + '\n')
+                stdout.flush()
+                return
+            if cmd not in HANDLERS:
+                raise ValueError(f"unknown cmd '{cmd}'")
+            resp = {'id': req_id, 'ok': True, 'result': HANDLERS[cmd](req.get('params') or {})}
+        except Exception as e:
+            resp = {'id': req_id, 'ok': False, 'error': f'{type(e).__name__}: {e}'}
+        stdout.write(json.dumps(resp) + '\n')
+        stdout.flush()
+
+
+def usage() -> str:
+    lines = ["usage: sui_coverage.py <command> [args...] | --serve-stdio", "", "commands:"]
+    for name, (_, desc) in COMMANDS.items():
+        lines.append(f"  {name:<10} {desc}")
+    lines.append("")
+    lines.append("Run `sui_coverage.py <command> --help` for command options.")
+    return '\n'.join(lines)
+
+
+def main():
+    argv = sys.argv[1:]
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        sys.exit(0 if argv else 1)
+    if argv[0] == '--serve-stdio':
+        serve_stdio()
+        return
+    if argv[0] not in COMMANDS:
+        print(f"Error: unknown command '{argv[0]}'\n\n{usage()}", file=sys.stderr)
+        sys.exit(1)
+
+    import importlib
+    module_name = COMMANDS[argv[0]][0]
+    module = importlib.import_module(module_name)
+    sys.argv = [f'{module_name}.py'] + argv[1:]
+    module.main()
+
+
+if __name__ == '__main__':
+    main()
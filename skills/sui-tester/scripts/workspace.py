@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Workspace coverage: run the per-package analyses across every Move package under a root.
+
+Discovers each `Move.toml` below the root, runs the run_tests.py pipeline (or,
+with --lcov-only, just the LCOV analysis of an existing lcov.info) for each
+package in a process pool, and rolls the results up into one workspace summary
+with per-package breakdowns. A failing package is reported, not fatal.
+
+Usage:
+    python3 workspace.py [root] [--jobs 4] [--json] [-o workspace.json]
+    python3 workspace.py examples/ --lcov-only --issues-only
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from analyze_lcov import add_coverage_pcts, analyze
+
+SKIP_DIRS = {'build', 'node_modules', 'target'}
+COUNTERS = ('functions', 'lines', 'branches')
+
+
+def discover_packages(root: str) -> List[str]:
+    """Directories under root that contain a Move.toml, skipping build output and hidden dirs."""
+    packages = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith('.'))
+        if 'Move.toml' in filenames:
+            packages.append(dirpath)
+    return packages
+
+
+def analyze_package(package_path: str, sui_bin: str = 'sui', lcov_only: bool = False,
+                    jobs: int = 2) -> dict:
+    """Per-package worker: full test + analysis pipeline, or LCOV analysis only."""
+    if lcov_only:
+        lcov_path = os.path.join(package_path, 'lcov.info')
+        if not os.path.exists(lcov_path):
+            raise FileNotFoundError(f'no lcov.info in {package_path}')
+        source_dir = os.path.join(package_path, 'sources')
+        return {'package': os.path.abspath(package_path), 'tests': None, 'modules': {}, 'errors': [],
+                'lcov': analyze(lcov_path, source_dir if os.path.isdir(source_dir) else None)}
+
+    from run_tests import run_pipeline
+    return run_pipeline(package_path, sui_bin, jobs=jobs)
+
+
+def package_summary(name: str, report: Optional[dict], error: Optional[str] = None) -> dict:
+    """Condense one package report into its workspace breakdown row."""
+    row = {'package': name, 'status': 'error' if error else 'ok', 'error': error}
+    if report is None:
+        return row
+    if report['tests']:
+        t = report['tests']
+        row['tests'] = {'total': t['total'], 'passed': t['passed'], 'failed': t['failed']}
+        if t['failed'] or t['exit_code']:
+            row['status'] = 'failed'
+    if report['lcov']:
+        row['coverage'] = report['lcov']['summary']
+    if report['errors']:
+        row['analysis_errors'] = report['errors']
+    return row
+
+
+def has_coverage_gaps(row: dict) -> bool:
+    """Same test as analyze_lcov --issues-only, at package level: any uncovered line,
+    untaken branch or uncalled function. Packages without coverage data count too."""
+    cov = row.get('coverage')
+    if not cov:
+        return True
+    return any(cov[f'total_{c}_hit'] < cov[f'total_{c}_found'] for c in COUNTERS)
+
+
+def rollup(rows: List[dict]) -> dict:
+    """Sum per-package counters into workspace totals."""
+    summary = {'packages': len(rows),
+               'packages_ok': sum(1 for r in rows if r['status'] == 'ok'),
+               'packages_failed': sum(1 for r in rows if r['status'] == 'failed'),
+               'packages_errored': sum(1 for r in rows if r['status'] == 'error'),
+               'total_tests': 0, 'tests_passed': 0, 'tests_failed': 0, 'total_files': 0}
+    for c in COUNTERS:
+        summary[f'total_{c}_found'] = 0
+        summary[f'total_{c}_hit'] = 0
+
+    for r in rows:
+        if 'tests' in r:
+            summary['total_tests'] += r['tests']['total']
+            summary['tests_passed'] += r['tests']['passed']
+            summary['tests_failed'] += r['tests']['failed']
+        cov = r.get('coverage')
+        if cov:
+            summary['total_files'] += cov['total_files']
+            for c in COUNTERS:
+                summary[f'total_{c}_found'] += cov[f'total_{c}_found']
+                summary[f'total_{c}_hit'] += cov[f'total_{c}_hit']
+
+    return add_coverage_pcts(summary)
+
+
+def run_workspace(root: str, sui_bin: str = 'sui', max_workers: int = 4, lcov_only: bool = False,
+                  package_jobs: int = 2, keep_reports: bool = False) -> dict:
+    """Analyze every package under root in a process pool and roll the results up."""
+    packages = discover_packages(root)
+    rows, reports = [], {}
+    if packages:
+        with ProcessPoolExecutor(max_workers=max(1, min(max_workers, len(packages)))) as pool:
+            futures = [(p, pool.submit(analyze_package, p, sui_bin, lcov_only, package_jobs))
+                       for p in packages]
+            for path, future in futures:
+                name = os.path.relpath(path, root)
+                try:
+                    report = future.result()
+                except Exception as e:
+                    rows.append(package_summary(name, None, f'{type(e).__name__}: {e}'))
+                    continue
+                rows.append(package_summary(name, report))
+                if keep_reports:
+                    reports[name] = report
+
+    result = {'root': os.path.abspath(root), 'summary': rollup(rows), 'packages': rows}
+    if keep_reports:
+        result['reports'] = reports
+    return result
+
+
+def print_report(result: dict):
+    s = result['summary']
+    print("=" * 70)
+    print("SUI MOVE WORKSPACE COVERAGE")
+    print("=" * 70)
+    print(f"\nRoot: {result['root']}")
+    print(f"Packages: {s['packages']} ({s['packages_ok']} ok, {s['packages_failed']} failing tests, "
+          f"{s['packages_errored']} errored)")
+    if s['total_tests']:
+        print(f"Tests: {s['tests_passed']}/{s['total_tests']} passed")
+    print(f"Function coverage: {s['total_functions_hit']}/{s['total_functions_found']} ({s.get('function_coverage_pct', 'N/A')}%)")
+    print(f"Line coverage: {s['total_lines_hit']}/{s['total_lines_found']} ({s.get('line_coverage_pct', 'N/A')}%)")
+    print(f"Branch coverage: {s['total_branches_hit']}/{s['total_branches_found']} ({s.get('branch_coverage_pct', 'N/A')}%)")
+
+    print("\n" + "-" * 70)
+    print(f"  {'Package':<36} {'Status':<8} {'Lines':>8} {'Branches':>9} {'Tests':>9}")
+    print("-" * 70)
+    for r in result['packages']:
+        cov = r.get('coverage', {})
+        lines = f"{cov['line_coverage_pct']}%" if 'line_coverage_pct' in cov else '-'
+        branches = f"{cov['branch_coverage_pct']}%" if 'branch_coverage_pct' in cov else '-'
+        tests = f"{r['tests']['passed']}/{r['tests']['total']}" if 'tests' in r else '-'
+        print(f"  {r['package']:<36} {r['status']:<8} {lines:>8} {branches:>9} {tests:>9}")
+        if r['error']:
+            print(f"      ! {r['error']}")
+
+    print("\n" + "=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run Sui Move coverage analyses across a workspace')
+    parser.add_argument('root', nargs='?', default='.', help='Workspace root (default: current dir)')
+    parser.add_argument('--jobs', '-J', type=int, default=os.cpu_count() or 4,
+                        help='Packages analyzed concurrently (default: CPU count)')
+    parser.add_argument('--package-jobs', type=int, default=2, help='Analysis workers inside each package')
+    parser.add_argument('--lcov-only', action='store_true',
+                        help="Only analyze each package's existing lcov.info (no sui invocations)")
+    parser.add_argument('--issues-only', '-i', action='store_true', help='Only list packages with coverage gaps')
+    parser.add_argument('--full', action='store_true', help='Include full per-package reports in JSON output')
+    parser.add_argument('--sui', default=os.environ.get('SUI_BIN', 'sui'), help='sui executable (default: $SUI_BIN or sui)')
+    parser.add_argument('--json', '-j', action='store_true', help='Output as JSON')
+    parser.add_argument('--output', '-o', help='Write the JSON report to a file')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"Error: Directory not found: {args.root}", file=sys.stderr)
+        sys.exit(1)
+
+    result = run_workspace(args.root, args.sui, args.jobs, args.lcov_only, args.package_jobs, args.full)
+    if not result['packages']:
+        print(f"Error: no Move.toml found under {args.root}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.issues_only:
+        result['packages'] = [r for r in result['packages'] if has_coverage_gaps(r)]
+
+    if args.json or args.output:
+        out = json.dumps(result, indent=2)
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(out)
+            print(f"Report saved to: {args.output}", file=sys.stderr)
+        else:
+            print(out)
+    else:
+        print_report(result)
+
+    s = result['summary']
+    sys.exit(0 if s['packages_ok'] == s['packages'] else 1)
+
+
+if __name__ == '__main__':
+    main()